@@ -0,0 +1,171 @@
+import csv
+import sys
+from typing import Iterator
+
+import numpy as np
+from history import SudokuHistory
+
+
+# Loại bản ghi trong lịch sử của solve_sudoku
+TRY = 0      # Thử một giá trị tại ô trống
+SKIP = 1     # Bỏ qua ô gợi ý
+PLACE = 2    # Điền giá trị hợp lệ và đi tiếp
+UNDO = 3     # Xoá giá trị vừa điền vì nhánh con thất bại (quay lui)
+EXHAUST = 4  # Đã thử hết giá trị tại ô, quay về ô trước (ngõ cụt)
+
+# Độ sâu tối đa là số ô trống, không quá 81
+MAX_DEPTH = 82
+
+
+def _kind(is_empty, num_input, move, location, next_location) -> int:
+    if move is None:
+        return TRY
+    if move > 0:
+        return SKIP if is_empty is False else PLACE
+    return UNDO if next_location == location else EXHAUST
+
+
+def iter_history_chunks(history: SudokuHistory, chunk_size: int = 1_000_000) -> Iterator[tuple]:
+    """
+    Chia lịch sử trong bộ nhớ thành các đoạn (chỉ số ô, loại bản ghi) dạng mảng numpy
+    """
+    for start in range(0, len(history.location), chunk_size):
+        stop = start + chunk_size
+        rows = zip(
+            history.location[start:stop], history.is_empty[start:stop], history.num_input[start:stop],
+            history.move[start:stop], history.next_location[start:stop]
+        )
+        cells, kinds = [], []
+        for location, is_empty, num_input, move, next_location in rows:
+            cells.append(location[0] * 9 + location[1])
+            kinds.append(_kind(is_empty, num_input, move, location, next_location))
+        yield np.array(cells, dtype=np.int16), np.array(kinds, dtype=np.int8)
+
+
+def _parse_bool(text: str):
+    return None if text == "" else text == "True"
+
+
+def iter_csv_chunks(path: str, chunk_size: int = 1_000_000) -> Iterator[tuple]:
+    """
+    Đọc lịch sử đã lưu bằng SudokuHistory.to_csv theo từng đoạn, không cần pandas
+    """
+    with open(path, "r", newline="") as file:
+        reader = csv.reader(file)
+        next(reader)  # Bỏ dòng tiêu đề
+
+        cells, kinds = [], []
+        for location, is_empty, num_input, _, move, next_location in reader:
+            cells.append(int(location[1]) * 9 + int(location[-2]))
+            kinds.append(_kind(
+                _parse_bool(is_empty), num_input or None,
+                float(move) if move else None, location, next_location
+            ))
+            if len(cells) >= chunk_size:
+                yield np.array(cells, dtype=np.int16), np.array(kinds, dtype=np.int8)
+                cells, kinds = [], []
+
+        if cells:
+            yield np.array(cells, dtype=np.int16), np.array(kinds, dtype=np.int8)
+
+
+class TraceAnalyzer:
+
+    def __init__(self):
+        """
+        Thống kê quá trình tìm kiếm qua một lượt duyệt lịch sử, bộ nhớ không phụ thuộc độ dài lịch sử
+        """
+        self.records = 0
+        self.depth = 0
+        self.tries = np.zeros(81, dtype=np.int64)
+        self.backtracks = np.zeros(81, dtype=np.int64)
+
+        # Số lần điền giá trị và số ngõ cụt theo độ sâu (số ô đã điền bởi tìm kiếm)
+        self.placements = np.zeros(MAX_DEPTH, dtype=np.int64)
+        self.dead_ends = np.zeros(MAX_DEPTH, dtype=np.int64)
+
+        # Số bản ghi trước lần quay lui đầu tiên, None nếu chưa quay lui
+        self.first_backtrack: int = None
+
+    def update(self, cells: np.ndarray, kinds: np.ndarray) -> None:
+        """
+        Cập nhật thống kê với một đoạn lịch sử
+        """
+        self.tries += np.bincount(cells[kinds == TRY], minlength=81)
+        self.backtracks += np.bincount(cells[kinds == UNDO], minlength=81)
+
+        # Độ sâu trước mỗi bản ghi: điền thì sâu thêm 1, quay lui thì nông đi 1
+        delta = (kinds == PLACE).astype(np.int64) - (kinds == UNDO)
+        depth = self.depth + np.cumsum(delta) - delta
+
+        self.placements += np.bincount(depth[kinds == PLACE], minlength=MAX_DEPTH)
+        self.dead_ends += np.bincount(depth[kinds == EXHAUST], minlength=MAX_DEPTH)
+
+        if self.first_backtrack is None:
+            back = np.flatnonzero((kinds == UNDO) | (kinds == EXHAUST))
+            if len(back):
+                self.first_backtrack = self.records + int(back[0])
+
+        if len(delta):
+            self.depth = int(depth[-1] + delta[-1])
+        self.records += len(kinds)
+
+    def branching(self) -> np.ndarray:
+        """
+        Hệ số phân nhánh theo độ sâu: số nút ở độ sâu d + 1 chia cho số nút ở độ sâu d
+        """
+        nodes = self.placements.astype(float)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ratio = nodes[1:] / nodes[:-1]
+        return np.where(nodes[:-1] > 0, ratio, 0.0)
+
+    def heatmap(self, kind: str = "tries") -> np.ndarray:
+        """
+        Bảng 9 x 9 trong khoảng [0, 1] thể hiện công sức tìm kiếm tại mỗi ô, theo thang log
+            kind: "tries" (số lần thử giá trị) hoặc "backtracks" (số lần quay lui)
+        """
+        counts = (self.tries if kind == "tries" else self.backtracks).reshape(9, 9)
+        if counts.max() == 0:
+            return np.zeros((9, 9))
+        return np.log1p(counts) / np.log1p(counts.max())
+
+    def summary(self) -> dict:
+        return {
+            "records": self.records,
+            "tries": self.tries.reshape(9, 9),
+            "backtracks": self.backtracks.reshape(9, 9),
+            "branching": self.branching(),
+            "dead_ends": self.dead_ends,
+            "first_backtrack": self.first_backtrack,
+        }
+
+
+def analyze(source, chunk_size: int = 1_000_000) -> TraceAnalyzer:
+    """
+    Phân tích lịch sử từ SudokuHistory hoặc từ file csv do SudokuHistory.to_csv tạo ra
+    """
+    if isinstance(source, SudokuHistory):
+        chunks = iter_history_chunks(source, chunk_size)
+    else:
+        chunks = iter_csv_chunks(source, chunk_size)
+
+    analyzer = TraceAnalyzer()
+    for cells, kinds in chunks:
+        analyzer.update(cells, kinds)
+    return analyzer
+
+
+if __name__ == "__main__":
+    # Cách dùng: python analytics.py <file lịch sử csv>
+    summary = analyze(sys.argv[1]).summary()
+    depths = np.flatnonzero(summary["dead_ends"])
+    print(f"Số bản ghi: {summary['records']}")
+    print(f"Quay lui lần đầu sau {summary['first_backtrack']} bản ghi")
+    print("Số lần thử mỗi ô:")
+    print(summary["tries"])
+    print("Số lần quay lui mỗi ô:")
+    print(summary["backtracks"])
+    print("Hệ số phân nhánh theo độ sâu:")
+    print(np.round(summary["branching"][:depths.max() + 2 if len(depths) else 0], 3))
+    print("Số ngõ cụt theo độ sâu:")
+    print({int(d): int(summary["dead_ends"][d]) for d in depths})
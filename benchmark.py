@@ -0,0 +1,246 @@
+import os
+import sys
+import time
+import subprocess
+import multiprocessing as mp
+
+import numpy as np
+from board import PEERS, load_bank
+from hint import HintEngine
+from solver import SudokuSolver
+from history import NullHistory
+from parallel import solve_batch, solve_split
+from restart import solve_with_restarts
+
+
+# Các module giao diện (pygame) và bản chạy độc lập sudokuRMK được phép dùng thư viện nặng.
+# Mọi module còn lại là module lõi, chỉ được phép import numpy, không được kéo theo các thư viện nặng;
+# module mới tự động được kiểm tra mà không cần thêm vào danh sách.
+UI_MODULES = ["game", "replay", "sudokuRMK", "benchmark"]
+CORE_MODULES = sorted(
+    name[:-3] for name in os.listdir(os.path.dirname(os.path.abspath(__file__)))
+    if name.endswith(".py") and name[:-3] not in UI_MODULES
+)
+HEAVY_MODULES = ["pandas", "pygame"]
+
+# Các câu đố khó được thêm vào bench_hint, vì ngân hàng dễ không làm lộ các trường hợp tìm kiếm lâu
+HARD_PUZZLES = [
+    "800000000003600000070090200050007000000045700000100030001000068008500010090000400",
+    "000000012000000003002300400001800005060070800000009000008500000900040500470006000",
+    "000000039000001005003050800008090006070002000100400000009080050020000600400700000",
+    "000000010400000000020000000000050407008000300001090000300400200050100000000806000",
+]
+
+
+def _solve_one(mat: np.ndarray) -> tuple:
+    """
+    Giải một câu đố, dùng cho pool thông thường (bảng được pickle qua lại)
+    """
+    solvable = SudokuSolver().solve_sudoku(mat, 0, 0, NullHistory())
+    return mat, solvable
+
+
+def bench_shared_memory(path: str, limit: int = 2000, processes: int = None) -> None:
+    """
+    So sánh giải lô câu đố bằng pool thông thường và bằng vùng nhớ chung (parallel.solve_batch)
+    """
+    boards = load_bank(path, limit)
+    processes = processes or mp.cpu_count()
+    print(f"{len(boards)} câu đố, {processes} tiến trình")
+
+    start = time.perf_counter()
+    with mp.Pool(processes) as pool:
+        results = pool.map(_solve_one, list(boards))
+    pickled = time.perf_counter() - start
+    print(f"pool thông thường: {pickled:.3f}s")
+
+    start = time.perf_counter()
+    out, solvable = solve_batch(boards, processes)
+    shared = time.perf_counter() - start
+    print(f"vùng nhớ chung:    {shared:.3f}s (x{pickled / shared:.2f})")
+
+    # Hai cách phải cho cùng kết quả
+    assert all(np.array_equal(mat, res) for (mat, _), res in zip(results, out))
+    assert all(ok == res for (_, ok), res in zip(results, solvable))
+
+
+def bench_import_time(path: str = None, repeat: int = 5) -> None:
+    """
+    Đo thời gian import các module lõi trong tiến trình mới (tốt nhất trong repeat lần),
+    so với numpy và giao diện game. Báo lỗi nếu module lõi kéo theo pandas hoặc pygame.
+    """
+    targets = {
+        "numpy": "import numpy",
+        "lõi": "import " + ", ".join(CORE_MODULES),
+        "game": "import game",
+    }
+    cwd = os.path.dirname(os.path.abspath(__file__))
+    check = "import sys; print(','.join(m for m in %r if m in sys.modules))" % HEAVY_MODULES
+
+    for name, stmt in targets.items():
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, "-c", stmt], cwd=cwd, check=True, capture_output=True)
+            best = min(best, time.perf_counter() - start)
+        print(f"{name:6s}: {best * 1000:.1f}ms")
+
+    loaded = subprocess.run(
+        [sys.executable, "-c", targets["lõi"] + "; " + check],
+        cwd=cwd, check=True, capture_output=True, text=True
+    ).stdout.strip()
+    assert not loaded, f"Module lõi đã import {loaded}"
+
+
+def bench_split(path: str, limit: int = 200, hardest: int = 5, depth: int = 3) -> None:
+    """
+    Chọn các câu đố giải tuần tự lâu nhất trong ngân hàng,
+    so sánh thời gian giải tuần tự với chia cây tìm kiếm (parallel.solve_split)
+    """
+    solver = SudokuSolver()
+    timings = []
+    for mat in load_bank(path, limit):
+        start = time.perf_counter()
+        solver.solve_sudoku(mat.copy(), 0, 0, NullHistory())
+        timings.append((time.perf_counter() - start, mat))
+    timings.sort(key=lambda item: item[0], reverse=True)
+
+    for sequential, mat in timings[:hardest]:
+        start = time.perf_counter()
+        assert solve_split(mat.copy(), depth)
+        split = time.perf_counter() - start
+        print(f"tuần tự {sequential:.3f}s, chia cây {split:.3f}s (x{sequential / split:.2f})")
+
+
+def _tail(values: list[float]) -> str:
+    """
+    Tóm tắt phân phối: p50, p99, p99.9 và giá trị lớn nhất, "n/a" nếu không có số liệu
+    """
+    if not values:
+        return "n/a"
+    p50, p99, p999 = np.percentile(values, [50, 99, 99.9])
+    return f"p50 {p50:.4f}  p99 {p99:.4f}  p99.9 {p999:.4f}  max {max(values):.4f}"
+
+
+def bench_restarts(path: str, limit: int = 500, seed: int = 0) -> None:
+    """
+    So sánh đuôi phân phối thời gian giải giữa backtracking tất định (thứ tự như solve_sudoku)
+    và tìm kiếm ngẫu nhiên có khởi động lại, có và không có lưu trạng thái vô nghiệm
+    """
+    boards = load_bank(path, limit)
+    solver = SudokuSolver()
+    modes = {
+        "tất định": lambda mat: (solver.search(mat, "row", "asc")[0], {"restarts": 0}),
+        "luby": lambda mat: solve_with_restarts(mat, seed, "luby"),
+        "geometric": lambda mat: solve_with_restarts(mat, seed, "geometric"),
+        "luby + nogood": lambda mat: solve_with_restarts(mat, seed, "luby", use_nogoods=True),
+    }
+
+    for name, solve in modes.items():
+        timings, restarts = [], []
+        for mat in boards:
+            start = time.perf_counter()
+            result, stats = solve(mat.copy())
+            timings.append(time.perf_counter() - start)
+            restarts.append(stats["restarts"])
+            assert result
+        print(f"{name:14s}: {_tail(timings)}  restarts tb {np.mean(restarts):.2f} max {max(restarts)}")
+
+
+def bench_hint(path: str, limit: int = 200, wrong_entries: int = 5) -> None:
+    """
+    Đo thời gian trả lời của HintEngine so với ngân sách một khung hình (16ms):
+    kiểm tra mọi giá trị của mọi ô trống, nhập một ô và tìm ô bị buộc tiếp theo,
+    giữ cùng lúc tới wrong_entries giá trị sai rồi gợi ý, kiểm tra gợi ý vẫn thuộc lời giải.
+    Luôn chạy thêm HARD_PUZZLES bên cạnh ngân hàng path.
+    """
+    hard = np.array([[int(num) for num in puzzle] for puzzle in HARD_PUZZLES], dtype=np.uint8).reshape(-1, 9, 9)
+    checks, updates, wrong = [], [], []
+    for mat in np.concatenate([load_bank(path, limit), hard]):
+        locked = [[mat[i][j] != 0 for j in range(9)] for i in range(9)]
+        engine = HintEngine(mat, locked)
+        for idx in np.flatnonzero(mat.reshape(81) == 0):
+            row, col = divmod(int(idx), 9)
+            for num in range(1, 10):
+                start = time.perf_counter()
+                engine.is_consistent(row, col, num)
+                checks.append(time.perf_counter() - start)
+
+        forced = engine.next_forced_cell()
+        if forced:
+            start = time.perf_counter()
+            engine.set_cell(*forced)
+            engine.next_forced_cell()
+            updates.append(time.perf_counter() - start)
+
+        # Nhập dần các giá trị sai không trùng với ô nào cùng hàng, cột, khối (lan truyền có thể
+        # chưa phát hiện), giữ tới wrong_entries giá trị cùng lúc rồi xoá hết và lặp lại.
+        # Mỗi lần nhập đo như trong game: nhập, đánh dấu sai và gợi ý; gợi ý vẫn phải thuộc lời giải
+        engine = HintEngine(mat, locked)
+        if engine.solution is None:
+            continue
+        entered = []
+        for idx in np.flatnonzero(mat.reshape(81) == 0):
+            row, col = divmod(int(idx), 9)
+            used = {engine.board[peer] for peer in PEERS[idx]}
+            values = [num for num in range(1, 10) if num not in used and num != engine.solution[idx]]
+            if not values:
+                continue
+
+            start = time.perf_counter()
+            engine.set_cell(row, col, values[0])
+            engine.is_consistent(row, col, values[0])
+            hint = engine.next_forced_cell()
+            wrong.append(time.perf_counter() - start)
+            entered.append((row, col))
+            if hint:
+                assert engine.is_consistent(*hint), f"gợi ý sai {hint} khi có giá trị sai ở {entered}"
+
+            if len(entered) == wrong_entries:
+                for cell in entered:
+                    engine.set_cell(*cell, 0)
+                entered = []
+
+    print(f"kiểm tra giá trị (s): {_tail(checks)}")
+    print(f"nhập và gợi ý (s):    {_tail(updates)}")
+    print(f"nhập sai và gợi ý (s): {_tail(wrong)}  (tối đa {wrong_entries} giá trị sai cùng lúc)")
+
+
+def bench_board(path: str, limit: int = 300) -> None:
+    """
+    Đo thời gian solve_sudoku và count_solutions khi bảng là uint8 (Board dùng chung vùng nhớ)
+    và khi bảng là int64 (Board phải sao chép rồi ghi lại)
+    """
+    solver = SudokuSolver()
+    bank = load_bank(path, limit)
+    for dtype in (np.uint8, np.int64):
+        boards = bank.astype(dtype)
+
+        start = time.perf_counter()
+        for mat in boards:
+            solver.solve_sudoku(mat, 0, 0, NullHistory())
+        solve = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for mat in bank.astype(dtype):
+            solver.count_solutions(mat, limit=2)
+        count = time.perf_counter() - start
+
+        print(f"{np.dtype(dtype).name:>6}: solve_sudoku {solve:.3f}s, count_solutions {count:.3f}s")
+
+
+BENCHMARKS = {
+    "shared": bench_shared_memory,
+    "import": bench_import_time,
+    "split": bench_split,
+    "restarts": bench_restarts,
+    "hint": bench_hint,
+    "board": bench_board,
+}
+
+
+if __name__ == "__main__":
+    # Cách dùng: python benchmark.py <tên benchmark> [đường dẫn ngân hàng câu đố]
+    name = sys.argv[1] if len(sys.argv) > 1 else "shared"
+    path = sys.argv[2] if len(sys.argv) > 2 else "easy.txt"
+    BENCHMARKS[name](path)
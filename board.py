@@ -0,0 +1,114 @@
+import numpy as np
+
+
+# Bảng tra cho 81 ô đánh số theo hàng (idx = row * 9 + col)
+CELL_ROW = tuple(idx // 9 for idx in range(81))
+CELL_COL = tuple(idx % 9 for idx in range(81))
+CELL_BOX = tuple((idx // 27) * 3 + (idx % 9) // 3 for idx in range(81))
+
+# 27 đơn vị: 9 hàng, 9 cột, 9 khối
+UNITS = tuple(
+    [tuple(idx for idx in range(81) if CELL_ROW[idx] == k) for k in range(9)]
+    + [tuple(idx for idx in range(81) if CELL_COL[idx] == k) for k in range(9)]
+    + [tuple(idx for idx in range(81) if CELL_BOX[idx] == k) for k in range(9)]
+)
+
+# 3 đơn vị chứa mỗi ô và 20 ô cùng hàng, cột hoặc khối với ô đó
+CELL_UNITS = tuple((UNITS[CELL_ROW[idx]], UNITS[9 + CELL_COL[idx]], UNITS[18 + CELL_BOX[idx]]) for idx in range(81))
+PEERS = tuple(
+    tuple(sorted(set(peer for unit in CELL_UNITS[idx] for peer in unit) - {idx}))
+    for idx in range(81)
+)
+
+
+class Board:
+
+    def __init__(self, cells: memoryview = None):
+        """
+        Bảng 81 ô liên tiếp, mỗi ô 1 byte, đánh số theo hàng (idx = row * 9 + col).
+        Đọc và ghi cells[idx] trả về int của Python, không tạo view hay số vô hướng numpy như mat[row][col].
+            cells: Vùng nhớ 81 byte có thể ghi, mặc định là bảng trống mới
+        """
+        self.cells = cells if cells is not None else memoryview(bytearray(81))
+
+        # Mảng gốc cần ghi lại khi bảng được tạo bằng cách sao chép, xem from_array
+        self._source: np.ndarray = None
+
+    @classmethod
+    def from_array(cls, mat: np.array) -> "Board":
+        """
+        Tạo bảng từ ma trận 9 x 9. Nếu mat là mảng uint8 liên tục thì bảng dùng chung vùng nhớ với mat,
+        ngược lại bảng là bản sao và sync() ghi kết quả trở lại mat.
+        """
+        arr = np.asarray(mat)
+        if arr.dtype == np.uint8 and arr.size == 81 and arr.flags.c_contiguous and arr.flags.writeable:
+            return cls(memoryview(arr).cast("B"))
+
+        board = cls(memoryview(bytearray(arr.astype(np.uint8).tobytes())))
+        board._source = arr
+        return board
+
+    def as_array(self) -> np.ndarray:
+        """
+        Ma trận 9 x 9 dùng chung vùng nhớ với bảng
+        """
+        return np.frombuffer(self.cells, dtype=np.uint8).reshape(9, 9)
+
+    def sync(self) -> None:
+        """
+        Ghi bảng trở lại ma trận gốc nếu bảng được tạo bằng cách sao chép
+        """
+        if self._source is not None:
+            self._source[...] = self.as_array().reshape(self._source.shape)
+
+    def used(self, idx: int) -> set[int]:
+        """
+        Các giá trị đã có ở những ô cùng hàng, cột hoặc khối với ô idx
+        """
+        cells = self.cells
+        return {cells[peer] for peer in PEERS[idx]}
+
+    def is_safe(self, idx: int, num: int) -> bool:
+        """
+        Kiểm tra giá trị num có trùng với các ô cùng hàng, cột hoặc khối với ô idx không
+        """
+        cells = self.cells
+        for peer in PEERS[idx]:
+            if cells[peer] == num:
+                return False
+        return True
+
+
+def load_grid(txt_grid: str) -> np.array:
+    """
+    Các bảng sudoku được viết theo kiểu chuỗi gồm 81 số.
+    Chuyển về dạng ma trận (1, 81), dùng reshape để chuyển về dạng bảng 9 x 9.
+    Dùng uint8 để Board.from_array không cần sao chép.
+    """
+    mat = np.array([int(num) for num in txt_grid], dtype=np.uint8).reshape(9, 9)
+    return mat
+
+
+def grid_to_text(mat: np.array) -> str:
+    """
+    Chuyển bảng 9 x 9 về chuỗi 81 số, ngược lại với load_grid
+    """
+    return "".join(str(int(num)) for num in np.asarray(mat).reshape(81))
+
+
+def load_bank(path: str, limit: int = None) -> np.ndarray:
+    """
+    Đọc ngân hàng câu đố, mỗi dòng có dạng "<id> <81 chữ số> ...", trả về mảng (n, 9, 9)
+        path: Đường dẫn đến ngân hàng câu đố
+        limit: Số câu đố tối đa cần đọc, mặc định đọc hết
+    """
+    boards = []
+    with open(path, "r") as file:
+        for line in file:
+            parts = line.split()
+            if len(parts) < 2:
+                continue
+            boards.append([int(num) for num in parts[1]])
+            if limit is not None and len(boards) >= limit:
+                break
+    return np.array(boards, dtype=np.uint8).reshape(-1, 9, 9)
@@ -0,0 +1,192 @@
+import sys
+import hashlib
+import functools
+import itertools
+import multiprocessing as mp
+
+import numpy as np
+from board import grid_to_text
+
+
+# 1296 hoán vị cột giữ nguyên cấu trúc khối: hoán vị 3 cột khối lớn, rồi hoán vị 3 cột trong mỗi khối
+_PERM3 = list(itertools.permutations(range(3)))
+COL_PERMS = np.array([
+    [3 * stack + col for i, stack in enumerate(stacks) for col in inner[i]]
+    for stacks in _PERM3
+    for inner in itertools.product(_PERM3, repeat=3)
+], dtype=np.uint8)
+
+# Trọng số để mã hoá mặt nạ một hàng thành số nguyên, cột đầu có trọng số lớn nhất
+_WEIGHTS = 1 << np.arange(8, -1, -1)
+
+# Trọng số để mã hoá chữ số của một hàng thành số nguyên, giữ thứ tự từ điển.
+# Khoá của một hàng là mặt nạ * _MASK_SCALE + chữ số, so sánh mặt nạ trước
+_DIGIT_WEIGHTS = 10 ** np.arange(8, -1, -1)
+_MASK_SCALE = 10 ** 9
+
+
+@functools.lru_cache(maxsize=None)
+def _mask_table() -> np.ndarray:
+    """
+    Bảng (512, 1296): mặt nạ của một hàng sau mỗi hoán vị cột, tính một lần khi dùng lần đầu
+    """
+    bits = (np.arange(512)[:, None] & _WEIGHTS) != 0
+    return (bits[:, COL_PERMS] * _WEIGHTS).sum(axis=2).astype(np.int16)
+
+
+def _next_rows(rows: tuple[int]) -> list[int]:
+    """
+    Các hàng gốc có thể đặt vào vị trí tiếp theo: đầu mỗi băng được chọn hàng của băng chưa dùng,
+    các vị trí còn lại chọn hàng chưa dùng trong cùng băng với hàng trước
+    """
+    if len(rows) % 3 == 0:
+        used = {row // 3 for row in rows}
+        return [row for row in range(9) if row // 3 not in used]
+    band = rows[-1] // 3
+    return [row for row in range(3 * band, 3 * band + 3) if row not in rows]
+
+
+def _relabel_next(values: np.ndarray, mapping: np.ndarray, labels: np.ndarray) -> np.ndarray:
+    """
+    Đánh số lại hàng tiếp theo (k, 9) của k bảng theo thứ tự xuất hiện đầu tiên.
+    mapping (k, 10) và labels (k,) là ánh xạ và số hiệu tiếp theo sau các hàng trước, được cập nhật tại chỗ.
+    """
+    flat = mapping.reshape(-1)
+    index = np.arange(0, mapping.size, 10)[:, None] + values
+    for col in range(9):
+        cells = index[:, col]
+        new = flat[cells] == 0
+        new &= values[:, col] != 0
+        flat[cells[new]] = labels[new]
+        labels[new] += 1
+    return flat[index]
+
+
+def canonical_form(mat: np.array) -> str:
+    """
+    Dạng chuẩn 81 chữ số của câu đố: hai câu đố có cùng dạng chuẩn khi và chỉ khi
+    biến đổi được sang nhau bằng chuyển vị, hoán vị băng/hàng trong băng,
+    hoán vị khối cột/cột trong khối và đánh số lại chữ số.
+    Dạng chuẩn là ảnh nhỏ nhất khi so sánh lần lượt từng hàng, mỗi hàng theo khoá
+    (mặt nạ ô trống, chữ số đã đánh số lại theo thứ tự xuất hiện). Khoá của một hàng chỉ phụ thuộc
+    các hàng đã chọn trước nó nên chỉ giữ các biến đổi có tiền tố nhỏ nhất sau mỗi hàng.
+    Các thứ tự chọn khác nhau của những hàng giống nhau được gộp, nên cả bảng đã điền đủ lẫn bảng
+    gần như trống (một, hai gợi ý) cũng chỉ mất vài chục ms (đo được tối đa khoảng 65ms).
+    """
+    grid = np.asarray(mat, dtype=np.uint8).reshape(9, 9)
+    if not grid.any():
+        return "0" * 81
+
+    orientations = (grid, grid.T)
+
+    # keys[o][row, p]: mặt nạ của hàng row sau hoán vị cột p
+    keys = [_mask_table()[(g != 0) @ _WEIGHTS] for g in orientations]
+
+    # Mỗi trạng thái: (hướng, các hàng gốc đã chọn, các hoán vị cột còn lại, ánh xạ chữ số, số hiệu tiếp theo)
+    perms = np.arange(len(COL_PERMS))
+    states = [
+        (o, (), perms, np.zeros((len(perms), 10), dtype=np.uint8), np.ones(len(perms), dtype=np.uint8))
+        for o in range(2)
+    ]
+    rows = []
+    for _ in range(9):
+        expanded, best = [], None
+        for o, chosen, perms, mapping, labels in states:
+            for row in _next_rows(chosen):
+                masks = keys[o][row, perms]
+                low = masks.min()
+                if best is not None and low > best // _MASK_SCALE:
+                    continue
+
+                # Chỉ đánh số lại các hoán vị có mặt nạ nhỏ nhất
+                keep = masks == low
+                sub_perms, sub_mapping, sub_labels = perms[keep], mapping[keep], labels[keep]
+                values = orientations[o][row][COL_PERMS[sub_perms]]
+                relabeled = _relabel_next(values, sub_mapping, sub_labels)
+                codes = relabeled.astype(np.int64) @ _DIGIT_WEIGHTS + int(low) * _MASK_SCALE
+
+                low = codes.min()
+                keep = codes == low
+                if best is None or low < best:
+                    expanded, best, best_row = {}, low, relabeled[np.argmax(keep)]
+                if low == best:
+                    state = (o, chosen + (row,), sub_perms[keep], sub_mapping[keep], sub_labels[keep])
+
+                    # Phần còn lại chỉ phụ thuộc tập hàng đã chọn, không phụ thuộc thứ tự chọn: các thứ tự
+                    # khác nhau của những hàng giống nhau (như các hàng trống) được gộp làm một trạng thái
+                    key = (o, frozenset(state[1])) + tuple(array.tobytes() for array in state[2:])
+                    expanded.setdefault(key, state)
+        states = list(expanded.values())
+        rows.append(best_row)
+
+    return grid_to_text(np.concatenate(rows))
+
+
+def canonical_hash(form: str) -> str:
+    """
+    Mã băm 64 bit của dạng chuẩn
+    """
+    return hashlib.blake2b(form.encode(), digest_size=8).hexdigest()
+
+
+def _canonical_line(line: str) -> tuple:
+    """
+    Tính (id, dạng chuẩn, mã băm) của một dòng "<id> <81 chữ số> ...", None nếu dòng trống
+    """
+    parts = line.split()
+    if len(parts) < 2:
+        return None
+    form = canonical_form([int(num) for num in parts[1]])
+    return parts[0], form, canonical_hash(form)
+
+
+def canonicalize_bank(
+        path: str,
+        dedup_path: str,
+        mapping_path: str,
+        processes: int = None,
+        batch_size: int = 10000
+) -> dict:
+    """
+    Tính dạng chuẩn của mọi câu đố trong ngân hàng trên nhiều tiến trình, đọc và ghi theo từng lô
+    nên bộ nhớ chỉ phụ thuộc batch_size và số câu đố khác nhau.
+        path: Ngân hàng câu đố đầu vào
+        dedup_path: Ngân hàng đã loại trùng, giữ nguyên dòng của câu đố đầu tiên trong mỗi lớp
+        mapping_path: Mỗi dòng "<id> <id đại diện> <dạng chuẩn> <mã băm>"
+        processes: Số tiến trình, mặc định bằng số lõi CPU
+        batch_size: Số dòng đọc vào mỗi lô
+    Trả về số dòng đã xử lý và số câu đố khác nhau
+    """
+    # Dạng chuẩn -> id câu đố đại diện. Khoá là chính dạng chuẩn chứ không phải mã băm 64 bit
+    # để hai câu đố khác nhau trùng mã băm không bị gộp; 81 chữ số được nén thành 41 byte
+    seen: dict[bytes, str] = {}
+    lines = 0
+
+    with open(path, "r") as src, \
+            open(dedup_path, "w") as dedup, \
+            open(mapping_path, "w") as mapping, \
+            mp.Pool(processes or mp.cpu_count()) as pool:
+
+        chunksize = max(1, batch_size // ((processes or mp.cpu_count()) * 4))
+        while True:
+            batch = list(itertools.islice(src, batch_size))
+            if not batch:
+                break
+
+            for line, result in zip(batch, pool.map(_canonical_line, batch, chunksize)):
+                if result is None:
+                    continue
+                lines += 1
+                puzzle_id, form, digest = result
+                key = bytes.fromhex("0" + form)
+                if key not in seen:
+                    seen[key] = puzzle_id
+                    dedup.write(line if line.endswith("\n") else line + "\n")
+                mapping.write(f"{puzzle_id} {seen[key]} {form} {digest}\n")
+
+    return {"lines": lines, "unique": len(seen)}
+
+
+if __name__ == "__main__":
+    # Cách dùng: python canonical.py <ngân hàng> <ngân hàng đã loại trùng> <file ánh xạ>
+    print(canonicalize_bank(sys.argv[1], sys.argv[2], sys.argv[3]))
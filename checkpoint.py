@@ -0,0 +1,253 @@
+import os
+import sys
+import struct
+from typing import BinaryIO
+
+import numpy as np
+from board import PEERS, grid_to_text
+
+
+# Định dạng trạng thái của một câu đố:
+#   "SDK1" | đề bài 81 byte | trạng thái 1 byte (0 đang giải, 1 giải được, 2 vô nghiệm)
+#   | giá trị tiếp theo cần thử 1 byte | số nút 8 byte | số lần quay lui 8 byte
+#   | độ sâu 1 byte | các giá trị đã điền theo thứ tự ô trống, mỗi giá trị 1 byte
+_SOLVER_MAGIC = b"SDK1"
+_SOLVER_HEADER = struct.Struct("<4s81sBBQQB")
+
+# Định dạng tiến độ giải hàng loạt:
+#   "SDB1" | số dòng đã xong 8 byte | vị trí trong file kết quả 8 byte
+#   | độ dài trạng thái câu đố đang giải 2 byte (0 nếu không có) | trạng thái câu đố
+_BATCH_MAGIC = b"SDB1"
+_BATCH_HEADER = struct.Struct("<4sQQH")
+
+RUNNING, SOLVED, UNSOLVABLE = 0, 1, 2
+
+
+def _write_atomic(path: str, data: bytes) -> None:
+    """
+    Ghi ra file tạm rồi đổi tên, file cũ vẫn nguyên vẹn nếu tiến trình bị dừng giữa chừng
+    """
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as file:
+        file.write(data)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(tmp, path)
+
+
+class ResumableSolver:
+
+    def __init__(self, mat: np.array):
+        """
+        Backtracking với ngăn xếp tường minh thay cho ngăn xếp lời gọi đệ quy,
+        duyệt ô và giá trị theo cùng thứ tự với solve_sudoku nên cho cùng lời giải.
+        Trạng thái có thể lưu ra bytes ở bất kỳ thời điểm nào và giải tiếp từ đó.
+            mat: Câu đố cần giải
+        """
+        self.puzzle = bytes(np.asarray(mat, dtype=np.uint8).reshape(81))
+        self.board = bytearray(self.puzzle)
+        self.empty = [idx for idx in range(81) if self.puzzle[idx] == 0]
+
+        # stack[k] là giá trị đang điền ở ô empty[k]
+        self.stack: list[int] = []
+        self.next_value = 1
+        self.status = RUNNING
+        self.nodes = 0
+        self.backtracks = 0
+
+    def run(self, budget: int = None) -> bool:
+        """
+        Giải tiếp tối đa budget bước (mỗi lần điền hoặc quay lui là một bước).
+        Trả về True/False khi đã giải xong, None nếu hết budget mà chưa xong.
+        """
+        if self.status != RUNNING:
+            return self.status == SOLVED
+
+        board, empty, stack = self.board, self.empty, self.stack
+        steps = 0
+        while budget is None or steps < budget:
+            steps += 1
+            depth = len(stack)
+
+            # Đã điền hết các ô trống
+            if depth == len(empty):
+                self.status = SOLVED
+                return True
+
+            idx = empty[depth]
+            peers = [board[peer] for peer in PEERS[idx]]
+            for num in range(self.next_value, 10):
+                if num not in peers:
+                    board[idx] = num
+                    stack.append(num)
+                    self.next_value = 1
+                    self.nodes += 1
+                    break
+            else:
+                # Hết giá trị ở ô đầu tiên thì câu đố vô nghiệm
+                if depth == 0:
+                    self.status = UNSOLVABLE
+                    return False
+
+                # Quay lui: thử giá trị tiếp theo ở ô trước
+                self.next_value = stack.pop() + 1
+                board[empty[depth - 1]] = 0
+                self.backtracks += 1
+
+        return None
+
+    def result(self) -> np.ndarray:
+        """
+        Bảng hiện tại dạng 9 x 9
+        """
+        return np.frombuffer(bytes(self.board), dtype=np.uint8).reshape(9, 9).copy()
+
+    def to_bytes(self) -> bytes:
+        header = _SOLVER_HEADER.pack(
+            _SOLVER_MAGIC, self.puzzle, self.status, self.next_value,
+            self.nodes, self.backtracks, len(self.stack)
+        )
+        return header + bytes(self.stack)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "ResumableSolver":
+        magic, puzzle, status, next_value, nodes, backtracks, depth = _SOLVER_HEADER.unpack_from(data)
+        if magic != _SOLVER_MAGIC:
+            raise ValueError("Không phải trạng thái của ResumableSolver")
+
+        solver = cls(np.frombuffer(puzzle, dtype=np.uint8))
+        solver.stack = list(data[_SOLVER_HEADER.size:_SOLVER_HEADER.size + depth])
+        for idx, num in zip(solver.empty, solver.stack):
+            solver.board[idx] = num
+        solver.status = status
+        solver.next_value = next_value
+        solver.nodes = nodes
+        solver.backtracks = backtracks
+        return solver
+
+    def save(self, path: str) -> None:
+        _write_atomic(path, self.to_bytes())
+
+    @classmethod
+    def load(cls, path: str) -> "ResumableSolver":
+        with open(path, "rb") as file:
+            return cls.from_bytes(file.read())
+
+
+def solve_resumable(mat: np.array, path: str, interval: int = 100000) -> bool:
+    """
+    Giải một câu đố, lưu trạng thái vào path sau mỗi interval bước.
+    Nếu path đã có trạng thái của cùng câu đố thì giải tiếp từ đó. Xoá file khi giải xong.
+    Lời giải được ghi vào mat giống solve_sudoku.
+    """
+    solver = ResumableSolver(mat)
+    if os.path.exists(path):
+        saved = ResumableSolver.load(path)
+        if saved.puzzle != solver.puzzle:
+            raise ValueError(f"{path} là trạng thái của câu đố khác")
+        solver = saved
+
+    while True:
+        result = solver.run(interval)
+        if result is not None:
+            break
+        solver.save(path)
+
+    if os.path.exists(path):
+        os.remove(path)
+    if result:
+        mat[:] = solver.result().reshape(np.shape(mat))
+    return result
+
+
+def _save_batch(path: str, out: BinaryIO, line: int, solver: ResumableSolver = None) -> None:
+    """
+    Đẩy kết quả xuống đĩa trước khi ghi tiến độ, để vị trí lưu trong tiến độ không vượt quá
+    phần kết quả thật sự nằm trên đĩa khi máy bị dừng đột ngột
+    """
+    out.flush()
+    os.fsync(out.fileno())
+    offset = out.tell()
+    state = solver.to_bytes() if solver is not None else b""
+    _write_atomic(path, _BATCH_HEADER.pack(_BATCH_MAGIC, line, offset, len(state)) + state)
+
+
+def _load_batch(path: str) -> tuple:
+    with open(path, "rb") as file:
+        data = file.read()
+    magic, line, offset, size = _BATCH_HEADER.unpack_from(data)
+    if magic != _BATCH_MAGIC:
+        raise ValueError(f"{path} không phải tiến độ giải hàng loạt")
+    state = data[_BATCH_HEADER.size:_BATCH_HEADER.size + size]
+    return line, offset, ResumableSolver.from_bytes(state) if size else None
+
+
+def run_batch(path: str, out_path: str, checkpoint_path: str, interval: int = 100000) -> int:
+    """
+    Giải toàn bộ ngân hàng câu đố, mỗi dòng kết quả có dạng "<id> <lời giải>" hoặc "<id> unsolvable".
+    Sau mỗi interval bước, tiến độ (số dòng đã xong, vị trí trong file kết quả và trạng thái
+    của câu đố đang giải dở) được lưu vào checkpoint_path. Nếu file này đã tồn tại thì chạy tiếp,
+    phần kết quả ghi sau lần lưu cuối bị cắt bỏ nên kết quả giống hệt khi chạy một lần.
+    Báo lỗi ValueError nếu file kết quả bị mất hoặc ngắn hơn vị trí đã lưu trong tiến độ.
+    Trả về số dòng đã xử lý.
+        path: Ngân hàng câu đố
+        out_path: File kết quả
+        checkpoint_path: File tiến độ, bị xoá khi chạy xong
+        interval: Số bước giữa hai lần lưu
+    """
+    done, offset, pending = 0, 0, None
+    if os.path.exists(checkpoint_path):
+        done, offset, pending = _load_batch(checkpoint_path)
+
+        # File kết quả bị mất hoặc ngắn hơn vị trí đã lưu: chạy tiếp sẽ để lại khoảng trống trong kết quả
+        size = os.path.getsize(out_path) if os.path.exists(out_path) else 0
+        if size < offset:
+            raise ValueError(f"{out_path} có {size} byte, ít hơn {offset} byte đã ghi trong {checkpoint_path}")
+
+    mode = "r+b" if os.path.exists(out_path) and done else "wb"
+    with open(path, "r") as src, open(out_path, mode) as out:
+        out.seek(offset)
+        out.truncate()
+
+        since = 0
+        for line_no, line in enumerate(src):
+            if line_no < done:
+                continue
+
+            parts = line.split()
+            if len(parts) < 2:
+                done = line_no + 1
+                continue
+
+            if pending is not None:
+                solver, pending = pending, None
+            else:
+                solver = ResumableSolver([int(num) for num in parts[1]])
+
+            while True:
+                steps = solver.nodes + solver.backtracks
+                result = solver.run(interval - since)
+                since += solver.nodes + solver.backtracks - steps
+                if result is not None:
+                    break
+
+                # Hết lượt: lưu cả câu đố đang giải dở
+                _save_batch(checkpoint_path, out, line_no, solver)
+                since = 0
+
+            text = grid_to_text(solver.result()) if result else "unsolvable"
+            out.write(f"{parts[0]} {text}\n".encode())
+            done = line_no + 1
+
+            if since >= interval:
+                _save_batch(checkpoint_path, out, done)
+                since = 0
+
+    if os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    return done
+
+
+if __name__ == "__main__":
+    # Cách dùng: python checkpoint.py <ngân hàng> <file kết quả> <file tiến độ>
+    print(run_batch(sys.argv[1], sys.argv[2], sys.argv[3]))
@@ -4,6 +4,10 @@ import random
 import pygame
 import numpy as np
 from enum import Enum
+from analytics import analyze
+from board import Board, CELL_ROW, CELL_COL, load_grid
+from hint import HintEngine
+from profiler import FrameProfiler
 from solver import SudokuSolver, SudokuHistory
 
 
@@ -22,6 +26,8 @@ class Color(Enum):
     QUIT = (180, 70, 70) # Đỏ đậm
     WIN = (50, 150, 50) # Xanh lục đậm
     SELECTED = (100, 150, 255) # Xanh dương
+    MISTAKE = (220, 50, 50) # Đỏ
+    HEAT = (255, 80, 0) # Cam, dùng cho bản đồ nhiệt
 
 
 class SudokuGame:
@@ -31,7 +37,8 @@ class SudokuGame:
             cell_size: int = 60, 
             button_height: int = 50,
             button_width: int = 120,
-            button_spacing: int = 20
+            button_spacing: int = 20,
+            seed: int = None
     ):
         """
         Đọc đường dẫn của các câu đố sudoku có sẵn
@@ -43,6 +50,7 @@ class SudokuGame:
             button_height: Chiều dài của nút bấm
             button_width: Chiều rộng của nút bấm
             button_spacing: Khoảng cách của nút bấm
+            seed: Hạt giống cho việc chọn câu đố ngẫu nhiên, dùng khi cần chạy lại giống hệt
         """
         # Kiểm tra file có tồn tại hay không
         assert os.path.exists(path)
@@ -50,6 +58,7 @@ class SudokuGame:
         # Đọc toàn bộ câu đố
         with open(path, "r") as file:
             self.grids = file.readlines()
+        self.rng = random.Random(seed)
 
         # Khởi tạo các biến
         """
@@ -58,18 +67,22 @@ class SudokuGame:
         won: Giá trị boolean thể hiện người chơi đã chiến thắng. Giá trị khởi tạo là False
         history: Là lớp SudokuHistory lưu lại quá trình giải của backtracking. Lớp SudokuHistory được khởi tạo sẽ là rỗng.
         selected_cell: Là tuple vị trí (x, y) của ô đã chọn. Giá trị khởi tạo là None và khi không chọn vào ô sẽ là None.
+        hints: Là lớp HintEngine giữ trạng thái lời giải của bảng hiện tại để phát hiện nhập sai và gợi ý.
+        mistakes: Tập các ô (x, y) người chơi đã nhập giá trị không thuộc lời giải.
+        heatmap: Bản đồ nhiệt 9x9 công sức tìm kiếm của lần giải gần nhất, None khi chưa giải.
         """
         self.locked: tuple[int] = None
         self.solved: bool = None
         self.won: bool = None
         self.history: SudokuHistory = None
         self.selected_cell: tuple[int] = None
+        self.hints: HintEngine = None
+        self.mistakes: set[tuple[int]] = None
+        self.heatmap: np.array = None
 
-        # Khởi tạo trạng thái mặc định trừ mat
-        self.reset()
         self.solver = SudokuSolver()
         # mat khởi tạo và locked sẽ là ma trận sử dụng trong bài báo cáo
-        self.mat = np.array([
+        self.reset(np.array([
             [5, 3, 0, 0, 7, 0, 0, 0, 0],
             [6, 0, 0, 1, 9, 5, 0, 0, 0],
             [0, 9, 8, 0, 0, 0, 0, 6, 0],
@@ -79,8 +92,7 @@ class SudokuGame:
             [0, 6, 0, 0, 0, 0, 2, 8, 0],
             [0, 0, 0, 4, 1, 9, 0, 0, 5],
             [0, 0, 0, 0, 8, 0, 0, 7, 9]
-        ], dtype=int)
-        self.locked = [[True if self.mat[i][j] != 0 else False for j in range(9)] for i in range(9)]
+        ], dtype=np.uint8))
 
         # Khởi tạo game, tạo screen, lưu thuộc tính
         pygame.init()
@@ -90,6 +102,13 @@ class SudokuGame:
         self.button_width = button_width
         self.button_spacing = button_spacing
 
+        # Đo thời gian từng khung hình, bảng thống kê được bật/tắt bằng F3
+        self.profiler = FrameProfiler()
+        self.show_hud = False
+
+        # Bản đồ nhiệt số lần thử giá trị của lần giải gần nhất, bật/tắt bằng phím M
+        self.show_heatmap = False
+
         self.screen_width = cell_size * 9
         self.total_buttons_width = self.button_width * 3 + self.button_spacing * 2
         self.button_x_start = (self.screen_width - self.total_buttons_width) // 2
@@ -99,13 +118,16 @@ class SudokuGame:
         self.screen = pygame.display.set_mode((self.screen_width, self.screen_height))
         self.screen.fill(Color.SCREEN.value)
 
-    def reset(self) -> None:
+    def reset(self, mat: np.array = None) -> None:
         """
         Reset lại trạng thái bằng cách lấy một bảng sudoku ngẫu nhiên
+            mat: Nếu có thì dùng bảng này thay cho bảng ngẫu nhiên
         """
-        txt_line = random.choice(self.grids).strip() # Lấy một dòng ngẫu nhiên
-        parts = txt_line.split() # Tách ra từng phần, do mỗi cột cách nhau bởi dấu cách
-        self.mat = self.load_grid(parts[1]) # Lấy giá trị thứ 2, chỉ số 1 là câu đố sudoku
+        if mat is None:
+            txt_line = self.rng.choice(self.grids).strip() # Lấy một dòng ngẫu nhiên
+            parts = txt_line.split() # Tách ra từng phần, do mỗi cột cách nhau bởi dấu cách
+            mat = self.load_grid(parts[1]) # Lấy giá trị thứ 2, chỉ số 1 là câu đố sudoku
+        self.mat = mat
 
         # Đặt lại các giá trị
         self.locked = [[True if self.mat[i][j] != 0 else False for j in range(9)] for i in range(9)]
@@ -113,6 +135,22 @@ class SudokuGame:
         self.won = False
         self.history = SudokuHistory()
         self.selected_cell = None
+        self.hints = HintEngine(self.mat, self.locked)
+        self.mistakes = set()
+        self.heatmap = None
+
+    def set_cell(self, i: int, j: int, num: int) -> None:
+        """
+        Nhập giá trị num vào ô (i, j), num = 0 nghĩa là xoá.
+        Đánh dấu ô nhập sai nếu giá trị không thuộc lời giải của câu đố.
+        """
+        self.mat[i][j] = num
+        self.hints.set_cell(i, j, num)
+
+        if num != 0 and not self.hints.is_consistent(i, j, num):
+            self.mistakes.add((i, j))
+        else:
+            self.mistakes.discard((i, j))
 
     def load_grid(self, txt_grid: str) -> np.array:
         """
@@ -120,8 +158,7 @@ class SudokuGame:
         trong đó ma trận là dữ liệu ở giữa là chuỗi gồm 81 số.
         Chuyển về dạng ma trận (1, 81), dùng reshape để chuyển vè dạng bảng 9 x 9.
         """
-        mat = np.array([int(num) for num in txt_grid]).reshape(9, 9)
-        return mat
+        return load_grid(txt_grid)
     
     def is_board_complete_and_valid(self, 
             mat: np.array, 
@@ -129,11 +166,14 @@ class SudokuGame:
     ) -> bool:
         """
         Kiểm tra sudoku đã được giải hay chưa
+        Mỗi ô người chơi điền chỉ được so sánh với 20 ô cùng hàng, cột, khối
         """
-        for i in range(9):
-            for j in range(9):
-                if mat[i][j] == 0 or (not locked[i][j] and not self.solver.is_safe(mat, i, j, mat[i][j])):
-                    return False
+        board = Board.from_array(mat)
+        cells = board.cells
+        for idx in range(81):
+            num = cells[idx]
+            if num == 0 or (not locked[CELL_ROW[idx]][CELL_COL[idx]] and not board.is_safe(idx, num)):
+                return False
         return True
     
     def draw_board(self, 
@@ -141,7 +181,9 @@ class SudokuGame:
             mat: np.array, 
             locked: list[list[bool]], 
             cell_size: int, 
-            selected_cell: tuple[int]=None
+            selected_cell: tuple[int]=None,
+            mistakes: set[tuple[int]]=None,
+            heatmap: np.array=None
     ) -> None:
         """
         Vẽ bảng câu đố, bao gồm tô màu các ô gợi ý, vẽ đường phân chia
@@ -150,6 +192,8 @@ class SudokuGame:
             locked: Ma trận boolean các số đã được gợi ý
             cell_size: Kích thước mỗi ô
             selected_cell: Vị trí ô hiện tại đang chọn (x, y)
+            mistakes: Các ô nhập sai, được tô chữ màu đỏ
+            heatmap: Bảng 9 x 9 giá trị trong [0, 1], ô càng đậm màu thì tìm kiếm càng tốn công
         """
         # Tô màu cho ô, màu xám nếu thuộc ô gợi ý
         for i in range(9):
@@ -161,6 +205,15 @@ class SudokuGame:
                     (j * cell_size, i * cell_size, cell_size, cell_size)
                 )
 
+        # Phủ bản đồ nhiệt bán trong suốt lên các ô
+        if heatmap is not None:
+            overlay = pygame.Surface((cell_size, cell_size), pygame.SRCALPHA)
+            for i in range(9):
+                for j in range(9):
+                    if heatmap[i][j] > 0:
+                        overlay.fill(Color.HEAT.value + (int(200 * heatmap[i][j]),))
+                        screen.blit(overlay, (j * cell_size, i * cell_size))
+
         # Vẽ các đường phân chia
         for i in range(10):
             thickness = 4 if i % 3 == 0 else 1 # Đường chia cắt các khối dày hơn
@@ -191,18 +244,45 @@ class SudokuGame:
         # Tạo font chữ
         font = pygame.font.Font(None, 40)
 
-        for i in range(9):
-            for j in range(9):
-                if mat[i][j] != 0:
-                    num = mat[i][j]
-                    if locked[i][j]:
-                        color = Color.BLACK.value  # Các ô gợi ý có chữ đen
-                    else:
-                        color = Color.GREEN.value # Các ô trống có chữ màu lục
+        cells = Board.from_array(mat).cells
+        for idx in range(81):
+            num = cells[idx]
+            if num != 0:
+                i, j = CELL_ROW[idx], CELL_COL[idx]
+                if locked[i][j]:
+                    color = Color.BLACK.value  # Các ô gợi ý có chữ đen
+                elif mistakes and (i, j) in mistakes:
+                    color = Color.MISTAKE.value # Các ô nhập sai có chữ đỏ
+                else:
+                    color = Color.GREEN.value # Các ô trống có chữ màu lục
+
+                text = font.render(str(num), True, color)
+                text_rect = text.get_rect(center=(j * cell_size + cell_size / 2, i * cell_size + cell_size / 2))
+                screen.blit(text, text_rect)
+
+    def export_history(self) -> None:
+        """
+        Ghi lịch sử của lần giải gần nhất ra history.csv
+        """
+        self.history.to_csv("history.csv")
 
-                    text = font.render(str(num), True, color)
-                    text_rect = text.get_rect(center=(j * cell_size + cell_size / 2, i * cell_size + cell_size / 2))
-                    screen.blit(text, text_rect)
+    def poll_events(self) -> list[pygame.event.Event]:
+        """
+        Lấy các event của khung hình hiện tại
+        """
+        return pygame.event.get()
+
+    def mouse_pos(self) -> tuple[int]:
+        """
+        Vị trí chuột hiện tại
+        """
+        return pygame.mouse.get_pos()
+
+    def mouse_pressed(self) -> tuple[bool]:
+        """
+        Trạng thái các nút chuột hiện tại
+        """
+        return pygame.mouse.get_pressed()
 
     def draw_button(self, 
             screen: pygame.surface.Surface, 
@@ -223,10 +303,10 @@ class SudokuGame:
             text_color: Màu chữ
         """
         # Lấy vị trí chuột
-        mouse = pygame.mouse.get_pos()
+        mouse = self.mouse_pos()
 
         # Kiểm tra xem được nhấn chưa
-        click = pygame.mouse.get_pressed()
+        click = self.mouse_pressed()
 
         # Chọn màu cho nút khi chưa được và được rê chuột vào
         is_in_area = x + w > mouse[0] > x and y + h > mouse[1] > y
@@ -243,59 +323,109 @@ class SudokuGame:
 
         return click[0] == 1 and is_in_area
 
+    def draw_hud(self, screen: pygame.surface.Surface, profiler: FrameProfiler) -> None:
+        """
+        Vẽ bảng thống kê hiệu năng ở góc trên bên trái: fps, p50/p99 thời gian khung hình
+        và thời gian trung bình của từng giai đoạn
+            screen: Màn hình game
+            profiler: Bộ đo thời gian khung hình
+        """
+        stats = profiler.stats()
+        lines = [
+            f"fps {stats['fps']:.0f}",
+            f"p50 {stats['p50']:.1f}ms  p99 {stats['p99']:.1f}ms",
+        ] + [f"{name} {ms:.2f}ms" for name, ms in stats["phases"].items()]
+
+        # Nền bán trong suốt để vẫn thấy bảng phía dưới
+        font = pygame.font.Font(None, 22)
+        height = 18 * len(lines) + 8
+        overlay = pygame.Surface((220, height), pygame.SRCALPHA)
+        overlay.fill((0, 0, 0, 170))
+        screen.blit(overlay, (0, 0))
+
+        for k, line in enumerate(lines):
+            text = font.render(line, True, Color.WHITE.value)
+            screen.blit(text, (6, 4 + 18 * k))
+
     def run(self) -> None:
         """
         Chạy game
+        F3 bật/tắt bảng thống kê hiệu năng, F4 xuất thời gian các khung hình ra frame_times.csv
         """
         pygame.display.set_caption("Sudoku Game")
 
         # Bắt đầu game
         running = True
+        phase = self.profiler.phase
 
         while running:
+            self.profiler.begin_frame()
 
             # Lấy các event
-            for event in pygame.event.get():
-
-                # Thoát game bằng nút X
-                if event.type == pygame.QUIT:
-                    running = False
-                    
-                # Nếu chưa thắng trò chơi
-                if not self.won:
-
-                    # Lấy vị trí chuột nếu bấm vào ô
-                    if event.type == pygame.MOUSEBUTTONDOWN:
-                        x, y = pygame.mouse.get_pos()
-
-                        # Nếu bấm chuột trong phạm vi 9 ô lấy chỉ số
-                        if y < self.cell_size * 9:
-                            i, j = y // self.cell_size, x // self.cell_size
-                            if not self.locked[i][j]:
-                                self.selected_cell = (i, j) # Lấy chỉ số của ô trong ma trận
-                        else:
-                            self.selected_cell = None
-
-                    # Nhận giá trị từ bàn phím hoặc xoá
-                    elif event.type == pygame.KEYDOWN and self.selected_cell:
-                        i, j = self.selected_cell
-
-                        # Xoá giá trị bằng delete hoặc backspace
-                        if event.key == pygame.K_BACKSPACE or event.key == pygame.K_DELETE:
-                            self.mat[i][j] = 0
-
-                        # Nhập số vào từ bàn phím
-                        elif event.unicode.isdigit() and int(event.unicode) in range(1, 10):
-                            num = int(event.unicode)
-                            self.mat[i][j] = num
+            with phase("events"):
+                for event in self.poll_events():
+
+                    # Thoát game bằng nút X
+                    if event.type == pygame.QUIT:
+                        running = False
+
+                    # Bật/tắt bảng thống kê và xuất thời gian khung hình
+                    if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                        self.show_hud = not self.show_hud
+                    elif event.type == pygame.KEYDOWN and event.key == pygame.K_F4:
+                        self.profiler.export("frame_times.csv")
+                    elif event.type == pygame.KEYDOWN and event.key == pygame.K_m:
+                        self.show_heatmap = not self.show_heatmap
+
+                    # Nếu chưa thắng trò chơi
+                    if not self.won:
+
+                        # Lấy vị trí chuột nếu bấm vào ô
+                        if event.type == pygame.MOUSEBUTTONDOWN:
+                            x, y = self.mouse_pos()
+
+                            # Nếu bấm chuột trong phạm vi 9 ô lấy chỉ số
+                            if y < self.cell_size * 9:
+                                i, j = y // self.cell_size, x // self.cell_size
+                                if not self.locked[i][j]:
+                                    self.selected_cell = (i, j) # Lấy chỉ số của ô trong ma trận
+                            else:
+                                self.selected_cell = None
+
+                        # Phím H điền ô tiếp theo đã bị buộc giá trị
+                        elif event.type == pygame.KEYDOWN and event.key == pygame.K_h:
+                            forced = self.hints.next_forced_cell()
+                            if forced:
+                                i, j, num = forced
+                                self.set_cell(i, j, num)
+                                self.selected_cell = (i, j)
+
+                        # Nhận giá trị từ bàn phím hoặc xoá
+                        elif event.type == pygame.KEYDOWN and self.selected_cell:
+                            i, j = self.selected_cell
+
+                            # Xoá giá trị bằng delete hoặc backspace
+                            if event.key == pygame.K_BACKSPACE or event.key == pygame.K_DELETE:
+                                self.set_cell(i, j, 0)
+
+                            # Nhập số vào từ bàn phím
+                            elif event.unicode.isdigit() and int(event.unicode) in range(1, 10):
+                                num = int(event.unicode)
+                                self.set_cell(i, j, num)
 
             # Vẽ bảng
-            self.draw_board(self.screen, self.mat, self.locked, self.cell_size, self.selected_cell)
+            with phase("draw_board"):
+                self.draw_board(
+                    self.screen, self.mat, self.locked, self.cell_size, self.selected_cell, self.mistakes,
+                    self.heatmap if self.show_heatmap else None
+                )
 
             # Hiện thông báo chiến thắng
-            if not self.won and self.is_board_complete_and_valid(self.mat, self.locked):
-                self.solved = True
-                self.won = True
+            with phase("validate"):
+                # Bảng do nút Solve giải không tính là chiến thắng
+                if not self.solved and self.is_board_complete_and_valid(self.mat, self.locked):
+                    self.solved = True
+                    self.won = True
 
             if self.won:
                 font = pygame.font.Font(None, 100)
@@ -307,46 +437,68 @@ class SudokuGame:
             if not self.solved:
 
                 # Vẽ nút "Solve", nếu bấm vào thì giải luôn
-                if self.draw_button(
-                    self.screen, "Solve", 
-                    self.button_x_start, self.button_y_start, 
-                    self.button_width, self.button_height,
-                    Color.INACTIVE.value, Color.ACTIVE.value
-                ):
+                with phase("draw_button"):
+                    clicked = self.draw_button(
+                        self.screen, "Solve", 
+                        self.button_x_start, self.button_y_start, 
+                        self.button_width, self.button_height,
+                        Color.INACTIVE.value, Color.ACTIVE.value
+                    )
+
+                if clicked:
                     # Giải câu đố bằng hàm solve_sudoku
-                    solvable = self.solver.solve_sudoku(self.mat, 0, 0, self.history)
-                    if solvable:
-                        self.solved = True
-                    
-                    self.history.to_csv("history.csv")
+                    with phase("solve"):
+                        solvable = self.solver.solve_sudoku(self.mat, 0, 0, self.history)
+                        if solvable:
+                            self.solved = True
+                            self.mistakes = set()
+
+                    # Bản đồ nhiệt được tính một lần sau mỗi lần giải, đo riêng vì lịch sử dài có thể mất vài giây
+                    with phase("heatmap"):
+                        self.heatmap = analyze(self.history).heatmap()
+
+                    # Ghi lịch sử ra csv (kèm import pandas lần đầu) được đo riêng, không tính vào thời gian giải
+                    with phase("export"):
+                        self.export_history()
 
             # Nếu giải rồi thì huỷ nút Solve
             else:
-                self.draw_button(self.screen, "Solved!", self.button_x_start, self.button_y_start, 
-                            self.button_width, self.button_height,
-                            Color.ACTIVE.value, Color.ACTIVE.value, Color.WHITE.value)
+                with phase("draw_button"):
+                    self.draw_button(self.screen, "Solved!", self.button_x_start, self.button_y_start, 
+                                self.button_width, self.button_height,
+                                Color.ACTIVE.value, Color.ACTIVE.value, Color.WHITE.value)
 
             # Nút làm mới bảng
-            if self.draw_button(
-                self.screen, "New", 
-                self.button_x_start + self.button_width + self.button_spacing, 
-                self.button_y_start, self.button_width, self.button_height, 
-                Color.INACTIVE.value, Color.ACTIVE.value
-            ):
+            with phase("draw_button"):
+                clicked = self.draw_button(
+                    self.screen, "New", 
+                    self.button_x_start + self.button_width + self.button_spacing, 
+                    self.button_y_start, self.button_width, self.button_height, 
+                    Color.INACTIVE.value, Color.ACTIVE.value
+                )
+            if clicked:
                 self.reset()
 
             # Nút thoát game "Quit"
-            if self.draw_button(
-                self.screen, 
-                "Quit", 
-                self.button_x_start + (self.button_width + self.button_spacing) * 2, 
-                self.button_y_start,
-                self.button_width, self.button_height, 
-                Color.INACTIVE.value, Color.QUIT.value
-            ):
+            with phase("draw_button"):
+                clicked = self.draw_button(
+                    self.screen, 
+                    "Quit", 
+                    self.button_x_start + (self.button_width + self.button_spacing) * 2, 
+                    self.button_y_start,
+                    self.button_width, self.button_height, 
+                    Color.INACTIVE.value, Color.QUIT.value
+                )
+            if clicked:
                 running = False
-            
-            pygame.display.flip()
+
+            if self.show_hud:
+                self.draw_hud(self.screen, self.profiler)
+
+            with phase("flip"):
+                pygame.display.flip()
+
+            self.profiler.end_frame()
 
         pygame.quit()
 
@@ -0,0 +1,237 @@
+import numpy as np
+from board import CELL_UNITS, PEERS
+
+
+# Tập giá trị ứng viên của một ô được lưu dưới dạng bitmask, bit (num - 1) ứng với giá trị num
+ALL = (1 << 9) - 1
+
+
+def _bit(num: int) -> int:
+    return 1 << (num - 1)
+
+
+def _value(mask: int) -> int:
+    """
+    Giá trị duy nhất của bitmask chỉ có một bit
+    """
+    return mask.bit_length()
+
+
+def _assign(cands: list[int], idx: int, num: int) -> bool:
+    """
+    Gán num cho ô idx bằng cách loại các ứng viên còn lại, lan truyền ràng buộc.
+    Trả về False nếu gặp mâu thuẫn.
+    """
+    others = cands[idx] & ~_bit(num)
+    while others:
+        bit = others & -others
+        others ^= bit
+        if not _eliminate(cands, idx, bit):
+            return False
+    return True
+
+
+def _eliminate(cands: list[int], idx: int, bit: int) -> bool:
+    """
+    Loại ứng viên bit khỏi ô idx và lan truyền:
+        - Ô chỉ còn một ứng viên thì loại ứng viên đó khỏi các ô cùng đơn vị
+        - Đơn vị chỉ còn một ô nhận được bit thì gán bit cho ô đó
+    """
+    if not cands[idx] & bit:
+        return True
+
+    cands[idx] &= ~bit
+    remain = cands[idx]
+    if remain == 0:
+        return False
+
+    if remain & (remain - 1) == 0:
+        for peer in PEERS[idx]:
+            if not _eliminate(cands, peer, remain):
+                return False
+
+    for unit in CELL_UNITS[idx]:
+        places = [cell for cell in unit if cands[cell] & bit]
+        if not places:
+            return False
+        if len(places) == 1 and cands[places[0]] != bit:
+            if not _assign(cands, places[0], _value(bit)):
+                return False
+
+    return True
+
+
+def _search(cands: list[int]) -> list[int]:
+    """
+    Tìm một lời giải từ trạng thái ứng viên đã lan truyền, chọn ô có ít ứng viên nhất.
+    Trả về danh sách ứng viên của lời giải (mỗi ô một bit) hoặc None nếu vô nghiệm.
+    """
+    best, best_count = None, 10
+    for idx in range(81):
+        count = bin(cands[idx]).count("1")
+        if 1 < count < best_count:
+            best, best_count = idx, count
+
+    # Mọi ô đều đã xác định
+    if best is None:
+        return cands
+
+    mask = cands[best]
+    while mask:
+        bit = mask & -mask
+        mask ^= bit
+        child = cands.copy()
+        if _assign(child, best, _value(bit)):
+            solution = _search(child)
+            if solution is not None:
+                return solution
+    return None
+
+
+def _count(cands: list[int], limit: int) -> int:
+    """
+    Đếm số lời giải từ trạng thái ứng viên đã lan truyền, dừng khi đã đếm đủ limit lời giải
+    """
+    best, best_count = None, 10
+    for idx in range(81):
+        count = bin(cands[idx]).count("1")
+        if 1 < count < best_count:
+            best, best_count = idx, count
+
+    if best is None:
+        return 1
+
+    total = 0
+    mask = cands[best]
+    while mask and total < limit:
+        bit = mask & -mask
+        mask ^= bit
+        child = cands.copy()
+        if _assign(child, best, _value(bit)):
+            total += _count(child, limit - total)
+    return total
+
+
+class HintEngine:
+
+    def __init__(self, mat: np.array, locked: list[list[bool]]):
+        """
+        Giữ trạng thái lan truyền ràng buộc của câu đố đang chơi để trả lời nhanh
+        "giá trị vừa nhập có phù hợp với lời giải không" và "ô nào đã bị buộc giá trị".
+        Trạng thái chỉ được tính lại từng phần khi người chơi thay đổi một ô.
+            mat: Bảng hiện tại, gồm gợi ý và các giá trị người chơi đã nhập
+            locked: Ma trận boolean các ô gợi ý
+        """
+        flat = np.asarray(mat).reshape(81)
+        self.board = [int(num) for num in flat]
+        self.locked = [bool(locked[idx // 9][idx % 9]) for idx in range(81)]
+
+        # Trạng thái ứng viên chỉ với các gợi ý, tính một lần cho mỗi câu đố
+        self.base = [ALL] * 81
+        for idx in range(81):
+            if self.locked[idx] and self.board[idx] != 0:
+                if not _assign(self.base, idx, self.board[idx]):
+                    self.base = None
+                    break
+
+        # Một lời giải của câu đố, dùng để kiểm tra nhanh
+        self.solution = None
+        if self.base is not None:
+            solution = _search(self.base.copy())
+            if solution is not None:
+                self.solution = [_value(mask) for mask in solution]
+
+        # Câu đố có lời giải duy nhất thì giá trị đúng khi và chỉ khi khớp lời giải,
+        # không cần tìm kiếm khi người chơi nhập
+        self.unique = self.solution is not None and _count(self.base.copy(), 2) == 1
+
+        # Kết quả is_consistent của câu đố nhiều lời giải, chỉ phụ thuộc các gợi ý nên giữ suốt ván chơi
+        self._consistent: dict[tuple[int], bool] = {}
+
+        # Trạng thái ứng viên gồm cả các giá trị người chơi đã nhập, None nếu có mâu thuẫn
+        self.state = self._rebuild()
+
+    def _rebuild(self) -> list[int]:
+        """
+        Tính lại trạng thái hiện tại từ trạng thái của các gợi ý
+        """
+        if self.base is None:
+            return None
+
+        cands = self.base.copy()
+        for idx in range(81):
+            if not self.locked[idx] and self.board[idx] != 0:
+                if not _assign(cands, idx, self.board[idx]):
+                    return None
+        return cands
+
+    def set_cell(self, row: int, col: int, num: int) -> None:
+        """
+        Cập nhật giá trị người chơi nhập vào ô (row, col), num = 0 nghĩa là xoá
+        """
+        idx = row * 9 + col
+        old = self.board[idx]
+        self.board[idx] = num
+
+        # Xoá hoặc ghi đè không thể hoàn tác lan truyền, phải tính lại từ trạng thái gợi ý
+        if num == 0 or old != 0:
+            self.state = self._rebuild()
+
+        # Thêm một giá trị: lan truyền tiếp trên bản sao của trạng thái hiện tại
+        elif self.state is not None:
+            cands = self.state.copy()
+            self.state = cands if _assign(cands, idx, num) else None
+
+    def is_consistent(self, row: int, col: int, num: int) -> bool:
+        """
+        Kiểm tra giá trị num tại ô (row, col) có nằm trong một lời giải của câu đố không
+        """
+        idx = row * 9 + col
+        if self.solution is not None and self.solution[idx] == num:
+            return True
+        if self.unique or self.base is None:
+            return False
+
+        # Lời giải đã biết không khớp, thử giải lại từ trạng thái gợi ý với giá trị này
+        key = (idx, num)
+        if key not in self._consistent:
+            cands = self.base.copy()
+            self._consistent[key] = _assign(cands, idx, num) and _search(cands) is not None
+        return self._consistent[key]
+
+    def _hint_state(self) -> list[int]:
+        """
+        Trạng thái dùng để gợi ý: chỉ gồm gợi ý và các giá trị người chơi nhập đúng.
+        Giá trị nhập sai có thể chưa gây mâu thuẫn khi lan truyền nhưng vẫn buộc sai các ô khác,
+        nên bị bỏ qua; nếu các giá trị còn lại mâu thuẫn với nhau thì chỉ dựa vào các gợi ý.
+        """
+        entries = [idx for idx in range(81) if not self.locked[idx] and self.board[idx] != 0]
+
+        # Trường hợp thường gặp: mọi giá trị đã nhập đều khớp lời giải đã biết
+        if self.solution is not None and all(self.solution[idx] == self.board[idx] for idx in entries):
+            return self.state
+
+        cands = self.base.copy()
+        for idx in entries:
+            if self.is_consistent(idx // 9, idx % 9, self.board[idx]):
+                if not _assign(cands, idx, self.board[idx]):
+                    return self.base
+        return cands
+
+    def next_forced_cell(self) -> tuple[int]:
+        """
+        Trả về (row, col, num) của ô trống đầu tiên mà lan truyền ràng buộc chỉ còn một giá trị,
+        hoặc None nếu không có. Các giá trị người chơi nhập sai không được dùng để suy ra gợi ý.
+        """
+        if self.base is None:
+            return None
+
+        cands = self._hint_state()
+        if cands is None:
+            return None
+
+        for idx in range(81):
+            mask = cands[idx]
+            if self.board[idx] == 0 and mask & (mask - 1) == 0:
+                return idx // 9, idx % 9, _value(mask)
+        return None
@@ -1,4 +1,7 @@
-import pandas as pd
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 
 class SudokuHistory:
@@ -35,10 +38,13 @@ class SudokuHistory:
         self.move.append(move)
         self.next_location.append(next_location)
 
-    def to_csv(self, path: str) -> pd.DataFrame:
+    def to_csv(self, path: str) -> "pd.DataFrame":
         """
         Lưu lịch sử về trong trường hợp mở rộng chương trình
+        pandas chỉ được import khi xuất file để các tiến trình chỉ giải không phải chờ import
         """
+        import pandas as pd
+
         df = pd.DataFrame({
             "location": self.location,
             "is_empty": self.is_empty,
@@ -49,4 +55,13 @@ class SudokuHistory:
         })
         df.to_csv(path, index=False)
         return df
-    
+
+
+class NullHistory(SudokuHistory):
+
+    def add_record(self, *args) -> None:
+        """
+        Bỏ qua mọi bản ghi, dùng khi giải hàng loạt không cần lưu lịch sử
+        """
+        pass
+
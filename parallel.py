@@ -0,0 +1,198 @@
+import multiprocessing as mp
+from multiprocessing import shared_memory
+
+import numpy as np
+from solver import SudokuSolver
+from history import NullHistory
+
+
+# Các mảng dùng chung trong tiến trình con, được gán bởi _init_worker
+_segments: list = []
+_boards: np.ndarray = None
+_out: np.ndarray = None
+_status: np.ndarray = None
+
+
+def _views(segments: list, n: int) -> tuple:
+    """
+    Tạo các mảng numpy trỏ trực tiếp vào vùng nhớ chung, trả về (boards, out, status)
+        segments: 3 vùng nhớ (đề bài, kết quả, trạng thái)
+        n: Số câu đố trong lô
+    """
+    boards = np.ndarray((n, 9, 9), dtype=np.uint8, buffer=segments[0].buf)
+    out = np.ndarray((n, 9, 9), dtype=np.uint8, buffer=segments[1].buf)
+    status = np.ndarray((n,), dtype=np.bool_, buffer=segments[2].buf)
+    return boards, out, status
+
+
+def _init_worker(names: list[str], n: int) -> None:
+    """
+    Khởi tạo tiến trình con: chỉ gắn vào vùng nhớ một lần, không sao chép dữ liệu
+    """
+    global _segments, _boards, _out, _status
+    _segments = [shared_memory.SharedMemory(name=name) for name in names]
+    _boards, _out, _status = _views(_segments, n)
+
+
+def _solve_range(bounds: tuple[int]) -> int:
+    """
+    Giải tại chỗ các câu đố có chỉ số trong [start, stop)
+    Chỉ có cặp chỉ số được truyền qua tiến trình, bảng được đọc và ghi trực tiếp trên vùng nhớ chung
+    """
+    start, stop = bounds
+    solver = SudokuSolver()
+    history = NullHistory()
+    for k in range(start, stop):
+        _out[k] = _boards[k]
+        _status[k] = solver.solve_sudoku(_out[k], 0, 0, history)
+    return stop - start
+
+
+def solve_batch(
+        boards: np.array,
+        processes: int = None,
+        chunk_size: int = None
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Giải một lô câu đố trên nhiều tiến trình, dùng multiprocessing.shared_memory
+    để truyền bảng mà không phải pickle từng câu đố.
+    Trả về (kết quả dạng (n, 9, 9), mảng boolean giải được hay không)
+        boards: Các câu đố, dạng (n, 9, 9) hoặc (n, 81)
+        processes: Số tiến trình, mặc định bằng số lõi CPU
+        chunk_size: Số câu đố trong một phần việc gửi cho tiến trình con
+    """
+    boards = np.asarray(boards, dtype=np.uint8).reshape(-1, 9, 9)
+    n = len(boards)
+    if n == 0:
+        return np.zeros((0, 9, 9), dtype=np.uint8), np.zeros(0, dtype=np.bool_)
+
+    processes = processes or mp.cpu_count()
+    if chunk_size is None:
+        # Chia nhỏ để cân bằng tải, nhưng đủ lớn để chi phí gửi việc không đáng kể
+        chunk_size = max(1, n // (processes * 4))
+
+    # Tạo 3 vùng nhớ chung: đề bài, kết quả và trạng thái
+    sizes = [boards.nbytes, boards.nbytes, n]
+    segments = [shared_memory.SharedMemory(create=True, size=size) for size in sizes]
+    names = [segment.name for segment in segments]
+    shared_boards = out = status = None
+    try:
+        shared_boards, out, status = _views(segments, n)
+        shared_boards[:] = boards
+
+        ranges = [(start, min(start + chunk_size, n)) for start in range(0, n, chunk_size)]
+        with mp.Pool(processes, initializer=_init_worker, initargs=(names, n)) as pool:
+            for _ in pool.imap_unordered(_solve_range, ranges):
+                pass
+
+        result, solvable = out.copy(), status.copy()
+    finally:
+        # Phải huỷ các view trước khi đóng vùng nhớ
+        shared_boards = out = status = None
+        for segment in segments:
+            segment.close()
+            segment.unlink()
+
+    return result, solvable
+
+
+def expand_frontier(mat: np.array, depth: int) -> list[np.ndarray]:
+    """
+    Mở rộng cây tìm kiếm theo thứ tự của solve_sudoku (theo hàng, giá trị từ 1 đến 9)
+    tới độ sâu depth, trả về các bảng điền dở là gốc của các cây con.
+    Nhánh nào có ô không điền được giá trị hợp lệ thì bị loại.
+        mat: Câu đố ban đầu
+        depth: Số ô trống được điền trước khi chia việc
+    """
+    solver = SudokuSolver()
+    frontier = [np.array(mat, dtype=np.uint8)]
+
+    for _ in range(depth):
+        expanded = []
+        for node in frontier:
+            empty = np.flatnonzero(node == 0)
+
+            # Bảng đã được điền hết, giữ nguyên
+            if len(empty) == 0:
+                expanded.append(node)
+                continue
+
+            row, col = divmod(int(empty[0]), 9)
+            for num in solver.candidates(node, row, col):
+                child = node.copy()
+                child[row, col] = num
+                expanded.append(child)
+        frontier = expanded
+
+    return frontier
+
+
+def _solve_subtree(node: np.ndarray) -> tuple:
+    """
+    Giải một cây con, trả về (giải được hay không, bảng)
+    """
+    solvable = SudokuSolver().solve_sudoku(node, 0, 0, NullHistory())
+    return solvable, node
+
+
+def _count_subtree(task: tuple) -> int:
+    """
+    Đếm số lời giải của một cây con, task gồm (bảng, limit)
+    """
+    node, limit = task
+    return SudokuSolver().count_solutions(node, 0, 0, limit)
+
+
+def solve_split(
+        mat: np.array,
+        depth: int = 3,
+        processes: int = None
+) -> bool:
+    """
+    Giải một câu đố khó trên nhiều tiến trình bằng cách chia cây tìm kiếm.
+    Các cây con được đưa vào một hàng đợi chung, tiến trình nào rảnh sẽ lấy cây con tiếp theo.
+    Khi một tiến trình tìm được lời giải thì huỷ toàn bộ các tiến trình còn lại.
+    Lời giải được ghi vào mat giống solve_sudoku.
+        mat: Câu đố cần giải
+        depth: Độ sâu mở rộng trước khi chia việc
+        processes: Số tiến trình, mặc định bằng số lõi CPU
+    """
+    frontier = expand_frontier(mat, depth)
+    if not frontier:
+        return False
+
+    # Thoát khỏi khối with sẽ gọi terminate(), dừng các tiến trình đang giải
+    with mp.Pool(processes or mp.cpu_count()) as pool:
+        for solvable, node in pool.imap_unordered(_solve_subtree, frontier, chunksize=1):
+            if solvable:
+                mat[:] = node
+                return True
+
+    return False
+
+
+def count_split(
+        mat: np.array,
+        depth: int = 3,
+        processes: int = None,
+        limit: int = None
+) -> int:
+    """
+    Đếm số lời giải trên nhiều tiến trình bằng cách chia cây tìm kiếm,
+    cộng dồn kết quả của các cây con. Huỷ các tiến trình khi đã đếm đủ limit lời giải.
+        mat: Câu đố cần đếm
+        depth: Độ sâu mở rộng trước khi chia việc
+        processes: Số tiến trình, mặc định bằng số lõi CPU
+        limit: Số lời giải tối đa cần đếm, mặc định đếm hết
+    """
+    frontier = expand_frontier(mat, depth)
+    tasks = [(node, limit) for node in frontier]
+
+    count = 0
+    with mp.Pool(processes or mp.cpu_count()) as pool:
+        for found in pool.imap_unordered(_count_subtree, tasks, chunksize=1):
+            count += found
+            if limit is not None and count >= limit:
+                return limit
+
+    return count
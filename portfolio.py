@@ -0,0 +1,151 @@
+import os
+import json
+import random
+import multiprocessing as mp
+
+import numpy as np
+from solver import SudokuSolver
+from restart import solve_with_restarts
+
+
+# Các cấu hình chạy song song. Cấu hình có "restarts" dùng restart.solve_with_restarts
+# với chính sách khởi động lại tương ứng.
+PORTFOLIO = {
+    "row-asc": {"cell_order": "row", "value_order": "asc"},
+    "row-desc": {"cell_order": "row", "value_order": "desc"},
+    "mrv-asc": {"cell_order": "mrv", "value_order": "asc"},
+    "mrv-desc": {"cell_order": "mrv", "value_order": "desc"},
+    "mrv-restart": {"cell_order": "mrv", "value_order": "random", "restarts": "luby"},
+}
+
+
+def puzzle_features(mat: np.array) -> str:
+    """
+    Đặc trưng của câu đố dùng để tra thống kê: số gợi ý (theo nhóm 5)
+    và số gợi ý ở hàng đầu tiên, nơi backtracking theo hàng bắt đầu
+    """
+    mat = np.asarray(mat)
+    givens = int(np.count_nonzero(mat))
+    first_row = int(np.count_nonzero(mat[0]))
+    return f"g{givens // 5 * 5}-r{first_row}"
+
+
+def _run_config(task: tuple) -> tuple:
+    """
+    Chạy một cấu hình trên bản sao của câu đố, trả về (tên, kết quả, bảng, số nút)
+    """
+    name, config, mat, seed = task
+    solver = SudokuSolver()
+
+    # Chỉ cấu hình "random" mới dùng rng; truyền rng cho cấu hình tất định sẽ làm MRV chọn ngẫu nhiên ô hoà nhau
+    rng = random.Random(seed) if config["value_order"] == "random" else None
+
+    policy = config.get("restarts")
+    if policy is None:
+        result, nodes = solver.search(mat, config["cell_order"], config["value_order"], rng)
+        return name, result, mat, nodes
+
+    result, stats = solve_with_restarts(mat, seed, policy, cell_order=config["cell_order"])
+    return name, result, mat, stats["nodes"]
+
+
+class PortfolioStats:
+
+    def __init__(self, path: str = None):
+        """
+        Thống kê số lần thắng của từng cấu hình theo đặc trưng câu đố
+            path: File json lưu thống kê giữa các lần chạy, None nếu chỉ giữ trong bộ nhớ
+        """
+        self.path = path
+
+        # wins[đặc trưng][tên cấu hình] = [số lần thắng, số lần chạy]
+        self.wins: dict[str, dict[str, list[int]]] = {}
+        if path is not None and os.path.exists(path):
+            with open(path, "r") as file:
+                self.wins = json.load(file)
+
+    def rank(self, key: str, names: list[str], rng: random.Random = None) -> list[str]:
+        """
+        Sắp xếp các cấu hình theo tỉ lệ thắng với đặc trưng key.
+        Các cấu hình hoà nhau (kể cả khi chưa có dữ liệu) được xáo trộn bằng rng nếu có,
+        để không cấu hình nào luôn được ưu tiên chỉ vì đứng đầu danh sách.
+        """
+        stats = self.wins.get(key, {})
+
+        def score(name: str) -> float:
+            won, runs = stats.get(name, [0, 0])
+            return (won + 1) / (runs + 2)
+
+        names = list(names)
+        if rng is not None:
+            rng.shuffle(names)
+        return sorted(names, key=score, reverse=True)
+
+    def update(self, key: str, winner: str, started: list[str]) -> None:
+        """
+        Ghi nhận cấu hình thắng trong số các cấu hình đã chạy, winner là None nếu không cấu hình nào thắng
+        """
+        stats = self.wins.setdefault(key, {})
+        for name in started:
+            record = stats.setdefault(name, [0, 0])
+            record[1] += 1
+            if name == winner:
+                record[0] += 1
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+        with open(self.path, "w") as file:
+            json.dump(self.wins, file)
+
+
+class PortfolioSolver:
+
+    def __init__(self,
+            configs: dict = None,
+            stats_path: str = None
+    ):
+        """
+        Giải sudoku bằng cách chạy đồng thời nhiều cấu hình và lấy kết quả đầu tiên.
+        Mỗi cấu hình có một tiến trình riêng, kể cả khi số cấu hình nhiều hơn số lõi CPU:
+        nếu xếp hàng chờ, cấu hình xếp sau sẽ không bao giờ chạy khi các cấu hình đầu bị kẹt.
+            configs: Các cấu hình, mặc định là PORTFOLIO
+            stats_path: File lưu thống kê cấu hình nào thắng theo đặc trưng câu đố
+        """
+        self.configs = configs or PORTFOLIO
+        self.stats = PortfolioStats(stats_path)
+        self.processes = len(self.configs)
+
+    def solve(self,
+            mat: np.array,
+            budget: float = 10.0,
+            seed: int = 0
+    ) -> tuple:
+        """
+        Giải câu đố trong giới hạn budget giây, lời giải được ghi vào mat.
+        Mọi cấu hình được khởi chạy cùng lúc theo thứ tự tỉ lệ thắng với đặc trưng của câu đố.
+        Hết thời gian thì mọi cấu hình được ghi một lần chạy không thắng.
+        Trả về (kết quả, tên cấu hình thắng); kết quả là None nếu hết thời gian.
+        """
+        key = puzzle_features(mat)
+        order = self.stats.rank(key, list(self.configs), random.Random(seed))
+        tasks = [(name, self.configs[name], np.array(mat), seed) for name in order]
+
+        # Thoát khỏi khối with sẽ gọi terminate(), huỷ các cấu hình còn đang chạy
+        with mp.Pool(self.processes) as pool:
+            results = pool.imap_unordered(_run_config, tasks, chunksize=1)
+            try:
+                name, result, solved, _ = results.next(budget)
+            except mp.TimeoutError:
+                name, result = None, None
+
+        if name is None:
+            self.stats.update(key, None, order)
+            self.stats.save()
+            return None, None
+
+        if result:
+            mat[:] = solved
+        self.stats.update(key, name, order)
+        self.stats.save()
+        return result, name
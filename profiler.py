@@ -0,0 +1,90 @@
+import csv
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import numpy as np
+
+
+# Biên của các cột histogram thời gian khung hình (ms), cột cuối gồm mọi khung hình chậm hơn
+HISTOGRAM_EDGES = (1, 2, 4, 8, 16, 33, 66)
+
+
+class FrameProfiler:
+
+    def __init__(self, window: int = 600):
+        """
+        Đo thời gian từng khung hình và từng giai đoạn trong khung hình,
+        giữ lại window khung hình gần nhất
+            window: Số khung hình được giữ để tính thống kê
+        """
+        self.frames: deque = deque(maxlen=window)
+        self.phases: list[str] = []
+        self._current: dict[str, float] = None
+        self._start: float = None
+
+    def begin_frame(self) -> None:
+        self._current = {}
+        self._start = time.perf_counter()
+
+    def end_frame(self) -> None:
+        if self._current is None:
+            return
+        self._current["frame"] = time.perf_counter() - self._start
+        self.frames.append(self._current)
+        self._current = None
+
+    @contextmanager
+    def phase(self, name: str):
+        """
+        Cộng dồn thời gian của giai đoạn name trong khung hình hiện tại
+        """
+        if self._current is None:
+            yield
+            return
+
+        if name not in self.phases:
+            self.phases.append(name)
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._current[name] = self._current.get(name, 0.0) + time.perf_counter() - start
+
+    def stats(self) -> dict:
+        """
+        Thống kê trên các khung hình đã giữ: fps, p50 và p99 thời gian khung hình (ms),
+        thời gian trung bình của từng giai đoạn (ms)
+        """
+        if not self.frames:
+            return {"fps": 0.0, "p50": 0.0, "p99": 0.0, "phases": {}}
+
+        totals = np.array([frame["frame"] for frame in self.frames]) * 1000
+        p50, p99 = np.percentile(totals, [50, 99])
+        phases = {
+            name: sum(frame.get(name, 0.0) for frame in self.frames) * 1000 / len(self.frames)
+            for name in self.phases
+        }
+        return {"fps": float(1000 * len(totals) / totals.sum()), "p50": float(p50), "p99": float(p99), "phases": phases}
+
+    def histogram(self) -> list[int]:
+        """
+        Số khung hình trong từng cột HISTOGRAM_EDGES, cột cuối là các khung hình chậm hơn 66ms
+        """
+        totals = [frame["frame"] * 1000 for frame in self.frames]
+        counts, _ = np.histogram(totals, bins=(0,) + HISTOGRAM_EDGES + (float("inf"),))
+        return counts.tolist()
+
+    def export(self, path: str) -> None:
+        """
+        Ghi thời gian (ms) của từng khung hình và từng giai đoạn ra file csv
+        """
+        with open(path, "w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(["frame"] + self.phases)
+            for frame in self.frames:
+                writer.writerow(
+                    [f"{frame['frame'] * 1000:.3f}"]
+                    + [f"{frame.get(name, 0.0) * 1000:.3f}" for name in self.phases]
+                )
@@ -0,0 +1,160 @@
+import os
+import sys
+import json
+import time
+
+import pygame
+from game import SudokuGame
+from profiler import FrameProfiler
+
+
+# Chỉ các event ảnh hưởng đến trò chơi được ghi lại
+RECORDED_EVENTS = (pygame.QUIT, pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP, pygame.KEYDOWN, pygame.KEYUP)
+
+
+def _encode(event: pygame.event.Event) -> dict:
+    """
+    Chuyển event về dạng json, bỏ các thuộc tính không lưu được
+    """
+    data = {"type": event.type}
+    for key, value in event.dict.items():
+        if isinstance(value, (int, float, str, bool, tuple, list)) or value is None:
+            data[key] = value
+    return data
+
+
+def _decode(data: dict) -> pygame.event.Event:
+    data = dict(data)
+    event_type = data.pop("type")
+    for key in ("pos", "rel"):
+        if key in data:
+            data[key] = tuple(data[key])
+    return pygame.event.Event(event_type, data)
+
+
+class RecordingGame(SudokuGame):
+
+    def __init__(self, path: str, seed: int = 0, **kwargs):
+        """
+        Chơi bình thường và ghi lại event, vị trí và trạng thái chuột của từng khung hình
+            path: Đường dẫn đến ngân hàng câu đố
+            seed: Hạt giống chọn câu đố, được lưu cùng bản ghi để phát lại giống hệt
+        """
+        super().__init__(path, seed=seed, **kwargs)
+        self.seed = seed
+        self.frames: list[dict] = []
+        self._pos = (0, 0)
+        self._pressed = (False, False, False)
+        self._start = time.perf_counter()
+
+    def poll_events(self) -> list[pygame.event.Event]:
+        """
+        Lấy event và chốt trạng thái chuột cho cả khung hình, để khi phát lại
+        mọi lần đọc chuột trong khung hình cho cùng kết quả
+        """
+        events = pygame.event.get()
+        self._pos = pygame.mouse.get_pos()
+        self._pressed = pygame.mouse.get_pressed()
+        self.frames.append({
+            "time": time.perf_counter() - self._start,
+            "events": [_encode(event) for event in events if event.type in RECORDED_EVENTS],
+            "pos": list(self._pos),
+            "pressed": list(self._pressed),
+        })
+        return events
+
+    def mouse_pos(self) -> tuple[int]:
+        return self._pos
+
+    def mouse_pressed(self) -> tuple[bool]:
+        return self._pressed
+
+    def save(self, path: str) -> None:
+        """
+        Lưu bản ghi: dòng đầu là seed, mỗi dòng sau là một khung hình
+        """
+        with open(path, "w") as file:
+            file.write(json.dumps({"seed": self.seed}) + "\n")
+            for frame in self.frames:
+                file.write(json.dumps(frame) + "\n")
+
+
+class ReplayGame(SudokuGame):
+
+    def __init__(self, path: str, recording: str, **kwargs):
+        """
+        Phát lại một bản ghi của RecordingGame, mỗi khung hình nhận đúng event và trạng thái chuột đã ghi.
+        Khi hết bản ghi thì gửi event QUIT để kết thúc.
+            path: Đường dẫn đến ngân hàng câu đố, phải giống lúc ghi
+            recording: Đường dẫn đến bản ghi
+        """
+        with open(recording, "r") as file:
+            header = json.loads(file.readline())
+            self.frames = [json.loads(line) for line in file if line.strip()]
+
+        super().__init__(path, seed=header["seed"], **kwargs)
+
+        # Giữ toàn bộ khung hình để tính thống kê trên cả lần phát lại
+        self.profiler = FrameProfiler(window=len(self.frames) + 1)
+        self._next = 0
+        self._pos = (0, 0)
+        self._pressed = (False, False, False)
+
+    def poll_events(self) -> list[pygame.event.Event]:
+        if self._next >= len(self.frames):
+            return [pygame.event.Event(pygame.QUIT)]
+
+        frame = self.frames[self._next]
+        self._next += 1
+        self._pos = tuple(frame["pos"])
+        self._pressed = tuple(frame["pressed"])
+        return [_decode(data) for data in frame["events"]]
+
+    def mouse_pos(self) -> tuple[int]:
+        return self._pos
+
+    def mouse_pressed(self) -> tuple[bool]:
+        return self._pressed
+
+    def export_history(self) -> None:
+        """
+        Phát lại không ghi history.csv, để không import pandas và ghi file vào thư mục hiện tại
+        """
+        pass
+
+
+def record(path: str, recording: str, seed: int = 0) -> None:
+    """
+    Mở cửa sổ game để chơi, lưu bản ghi khi thoát
+    """
+    game = RecordingGame(path, seed)
+    game.run()
+    game.save(recording)
+
+
+def replay(path: str, recording: str) -> dict:
+    """
+    Phát lại bản ghi không cần màn hình (SDL dummy video driver),
+    trả về thống kê thời gian khung hình và thời gian của các lần giải (ms).
+    Lịch sử không được ghi ra csv nên thời gian giải chỉ gồm solve_sudoku.
+    """
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+    game = ReplayGame(path, recording)
+    game.run()
+
+    stats = game.profiler.stats()
+    stats["frames"] = len(game.profiler.frames)
+    stats["histogram"] = game.profiler.histogram()
+    stats["solve"] = [frame["solve"] * 1000 for frame in game.profiler.frames if "solve" in frame]
+    return stats
+
+
+if __name__ == "__main__":
+    # Cách dùng: python replay.py record|play <bản ghi> [đường dẫn ngân hàng câu đố]
+    mode, recording = sys.argv[1], sys.argv[2]
+    path = sys.argv[3] if len(sys.argv) > 3 else "easy.txt"
+    if mode == "record":
+        record(path, recording)
+    else:
+        print(json.dumps(replay(path, recording), indent=2))
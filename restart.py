@@ -0,0 +1,75 @@
+import random
+
+import numpy as np
+from solver import SudokuSolver
+
+
+def luby(i: int) -> int:
+    """
+    Phần tử thứ i (bắt đầu từ 1) của dãy Luby: 1, 1, 2, 1, 1, 2, 4, 1, 1, 2, ...
+    """
+    k = 1
+    while (1 << k) - 1 < i:
+        k += 1
+    while i != (1 << k) - 1:
+        i -= (1 << (k - 1)) - 1
+        k = 1
+        while (1 << k) - 1 < i:
+            k += 1
+    return 1 << (k - 1)
+
+
+def cutoff(policy: str, i: int, base: int, factor: float) -> int:
+    """
+    Giới hạn số nút cho lần chạy thứ i (bắt đầu từ 1)
+        policy: "luby" (base * luby(i)) hoặc "geometric" (base * factor^(i-1))
+    """
+    if policy == "luby":
+        return base * luby(i)
+    if policy == "geometric":
+        return int(base * factor ** (i - 1))
+    raise ValueError(f"Chính sách khởi động lại không hợp lệ: {policy}")
+
+
+def solve_with_restarts(
+        mat: np.array,
+        seed: int = 0,
+        policy: str = "luby",
+        base: int = 100,
+        factor: float = 2.0,
+        cell_order: str = "mrv",
+        use_nogoods: bool = False,
+        max_restarts: int = None
+) -> tuple:
+    """
+    Giải sudoku bằng tìm kiếm ngẫu nhiên có khởi động lại, lời giải được ghi vào mat.
+    Thứ tự thử giá trị và thứ tự chọn các ô hoà nhau được xáo trộn theo seed,
+    mỗi lần chạy dừng khi vượt giới hạn số nút rồi bắt đầu lại từ đầu.
+        mat: Câu đố cần giải
+        seed: Hạt giống, cùng seed cho cùng kết quả
+        policy: "luby" hoặc "geometric", xem cutoff
+        base: Giới hạn số nút cơ sở
+        factor: Hệ số tăng của "geometric"
+        cell_order: "row" hoặc "mrv", xem SudokuSolver.select_cell
+        use_nogoods: Lưu các trạng thái vô nghiệm để dùng lại giữa các lần chạy
+        max_restarts: Số lần khởi động lại tối đa, mặc định không giới hạn
+    Trả về (kết quả, thống kê) với thống kê gồm "restarts" và "nodes".
+    Kết quả là None nếu đã hết số lần khởi động lại.
+    """
+    solver = SudokuSolver()
+    rng = random.Random(seed)
+    nogoods = set() if use_nogoods else None
+    stats = {"restarts": 0, "nodes": 0}
+
+    i = 1
+    while True:
+        limit = cutoff(policy, i, base, factor)
+        result, nodes = solver.search(mat, cell_order, "random", rng, limit, nogoods)
+        stats["nodes"] += nodes
+        if result is not None:
+            return result, stats
+
+        if max_restarts is not None and stats["restarts"] >= max_restarts:
+            return None, stats
+        stats["restarts"] += 1
+        i += 1
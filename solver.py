@@ -1,7 +1,9 @@
 from typing import Tuple
 
 import time
+import random
 import numpy as np
+from board import Board, CELL_ROW, CELL_COL
 from history import SudokuHistory
 
 
@@ -18,21 +20,9 @@ class SudokuSolver:
     ) -> bool:
         """
         Kiểm tra giá trị đầu vào có trùng với giá trị units không
+        Chỉ so sánh với 20 ô cùng hàng, cột, khối (không tính chính ô đang xét)
         """
-        # Kiểm tra hàng
-        if num in mat[row, :]:
-            return False
-        
-        # Kiểm tra cột
-        if num in mat[:, col]:
-            return False
-        
-        # Kiểm tra khối
-        start_row, start_col = 3 * (row // 3), 3 * (col // 3)
-        if num in mat[start_row:start_row + 3, start_col:start_col + 3]:
-            return False
-        
-        return True
+        return Board.from_array(mat).is_safe(row * 9 + col, num)
 
     def solve_sudoku(self, 
             mat: np.array, 
@@ -43,40 +33,53 @@ class SudokuSolver:
         """
         Giải sudoku, trả về kết quả fail nếu thời gian vượt quá quy định
         Hoặc không giải được do cấu hình
+        Bảng 9 x 9 được chuyển sang Board (không sao chép nếu là mảng uint8) để giải trên 81 ô liên tiếp
         """
+        board = Board.from_array(mat)
+        solvable = self._solve_cells(board, row * 9 + col, history)
+        board.sync()
+        return solvable
 
-        # Nếu đạt tới hàng thứ 10 (index 9) thì hoàn thành
-        if row == 9:
+    def _solve_cells(self,
+            board: Board,
+            idx: int,
+            history: SudokuHistory
+    ) -> bool:
+        cells = board.cells
+
+        # Nếu đi hết 81 ô thì hoàn thành
+        if idx == 81:
             return True
-        
-        # Nếu vượt cột thì xuống hàng tiếp
-        if col == 9:
-            return self.solve_sudoku(mat, row + 1, 0, history)
-        
+
+        row, col = CELL_ROW[idx], CELL_COL[idx]
+
         # Bỏ qua những giá trị không rỗng
-        if mat[row][col] != 0:
+        if cells[idx] != 0:
             history.add_record((row, col), False, None, None, 1, (row, col + 1))
-            return self.solve_sudoku(mat, row, col + 1, history)
-        
+            return self._solve_cells(board, idx + 1, history)
+
+        # Các giá trị ở ô cùng đơn vị không đổi trong vòng lặp vì nhánh con luôn hoàn tác trước khi trả về
+        used = board.used(idx)
+
         # Duyệt từng giá trị
         for num in range(1, 10):
 
             # Kiểm tra giá trị hợp lệ
-            valid = self.is_safe(mat, row, col, num)
+            valid = num not in used
             history.add_record((row, col), True, num, valid, None, None)
 
             # Nếu hợp lệ
             if valid:
-                mat[row][col] = num
+                cells[idx] = num
                 history.add_record((row, col), None, None, None, 1, (row, col + 1))
-                solvable = self.solve_sudoku(mat, row, col + 1, history)
+                solvable = self._solve_cells(board, idx + 1, history)
 
                 # Nếu đã giải xong thì trả về True
                 if solvable:
                     return True
                 
                 # Nếu chưa giải xong thì backtracking
-                mat[row][col] = 0
+                cells[idx] = 0
                 history.add_record((row, col), None, None, None, -1, (row, col))
 
         # Lưu lịch sử, không ảnh hướng đến giải thuật
@@ -87,7 +90,174 @@ class SudokuSolver:
 
         # Trả về False
         return False
-        
+
+    def count_solutions(self,
+            mat: np.array,
+            row: int = 0,
+            col: int = 0,
+            limit: int = None
+    ) -> int:
+        """
+        Đếm số lời giải của câu đố, dừng sớm khi đã đếm đủ limit lời giải
+        Bảng được trả lại trạng thái ban đầu sau khi đếm
+        """
+        return self._count_cells(Board.from_array(mat), row * 9 + col, limit)
+
+    def _count_cells(self, board: Board, idx: int, limit: int) -> int:
+        cells = board.cells
+
+        # Bỏ qua các ô đã có giá trị
+        while idx < 81 and cells[idx] != 0:
+            idx += 1
+
+        # Điền hết bảng là một lời giải
+        if idx == 81:
+            return 1
+
+        count = 0
+        used = board.used(idx)
+        for num in range(1, 10):
+            if num not in used:
+                cells[idx] = num
+                remain = None if limit is None else limit - count
+                count += self._count_cells(board, idx + 1, remain)
+                cells[idx] = 0
+
+                # Đã đủ số lời giải cần đếm
+                if limit is not None and count >= limit:
+                    break
+
+        return count
+
+    def candidates(self,
+            mat: np.array,
+            row: int,
+            col: int
+    ) -> list[int]:
+        """
+        Danh sách các giá trị hợp lệ của ô (row, col)
+        """
+        used = Board.from_array(mat).used(row * 9 + col)
+        return [num for num in range(1, 10) if num not in used]
+
+    def select_cell(self,
+            mat: np.array,
+            cell_order: str = "row",
+            rng: random.Random = None
+    ) -> Tuple[int, int, list[int]]:
+        """
+        Chọn ô trống tiếp theo, trả về (row, col, các giá trị hợp lệ) hoặc None nếu đã điền hết
+            cell_order: "row" lấy ô trống đầu tiên theo hàng như solve_sudoku,
+                        "mrv" lấy ô có ít giá trị hợp lệ nhất
+            rng: Nếu có, các ô hoà nhau khi dùng "mrv" được chọn ngẫu nhiên
+        """
+        cell = self._select_cell(Board.from_array(mat), cell_order, rng)
+        if cell is None:
+            return None
+        idx, values = cell
+        return CELL_ROW[idx], CELL_COL[idx], values
+
+    def _select_cell(self,
+            board: Board,
+            cell_order: str,
+            rng: random.Random
+    ) -> Tuple[int, list[int]]:
+        cells = board.cells
+        best, ties = None, 0
+        for idx in range(81):
+            if cells[idx] != 0:
+                continue
+
+            used = board.used(idx)
+            values = [num for num in range(1, 10) if num not in used]
+
+            # Ô trống đầu tiên theo hàng, hoặc ô không còn giá trị hợp lệ (nhánh chắc chắn thất bại)
+            if cell_order == "row" or not values:
+                return idx, values
+
+            if best is None or len(values) < len(best[1]):
+                best, ties = (idx, values), 1
+            elif len(values) == len(best[1]) and rng is not None:
+                # Chọn ngẫu nhiên đều trong các ô hoà nhau
+                ties += 1
+                if rng.randrange(ties) == 0:
+                    best = (idx, values)
+        return best
+
+    def search(self,
+            mat: np.array,
+            cell_order: str = "row",
+            value_order: str = "asc",
+            rng: random.Random = None,
+            node_limit: int = None,
+            nogoods: set = None
+    ) -> Tuple[bool, int]:
+        """
+        Giải sudoku với thứ tự chọn ô và thứ tự thử giá trị tuỳ chỉnh, lời giải được ghi vào mat
+            cell_order: "row" hoặc "mrv", xem select_cell
+            value_order: "asc" (1 đến 9), "desc" (9 đến 1) hoặc "random" (cần rng)
+            rng: random.Random dùng để xáo trộn giá trị và chọn ô hoà nhau
+            node_limit: Số nút tối đa được duyệt
+            nogoods: Tập các trạng thái bảng đã biết là vô nghiệm, được đọc và bổ sung khi tìm kiếm.
+                     Dùng chung một tập giữa các lần khởi động lại để không duyệt lại nhánh đã thất bại.
+        Trả về (kết quả, số nút đã duyệt). Kết quả là None nếu dừng do vượt node_limit,
+        khi đó mat được trả lại trạng thái ban đầu.
+        """
+        board = Board.from_array(mat)
+        nodes = [0]
+        result = self._search(board, cell_order, value_order, rng, node_limit, nodes, nogoods)
+        board.sync()
+        return result, nodes[0]
+
+    def _search(self,
+            board: Board,
+            cell_order: str,
+            value_order: str,
+            rng: random.Random,
+            node_limit: int,
+            nodes: list[int],
+            nogoods: set
+    ) -> bool:
+        cells = board.cells
+
+        # Trạng thái này đã được duyệt hết ở lần trước mà không có lời giải
+        if nogoods is not None:
+            state = cells.tobytes()
+            if state in nogoods:
+                return False
+
+        cell = self._select_cell(board, cell_order, rng)
+
+        # Đã điền hết bảng
+        if cell is None:
+            return True
+
+        idx, values = cell
+        if value_order == "desc":
+            values.reverse()
+        elif value_order == "random":
+            rng.shuffle(values)
+
+        for num in values:
+            if node_limit is not None and nodes[0] >= node_limit:
+                return None
+
+            nodes[0] += 1
+            cells[idx] = num
+            result = self._search(board, cell_order, value_order, rng, node_limit, nodes, nogoods)
+            if result:
+                return True
+
+            # Backtracking, kể cả khi dừng do vượt giới hạn
+            cells[idx] = 0
+            if result is None:
+                return None
+
+        # Chỉ ghi nhận khi đã duyệt hết nhánh, không bị cắt bởi node_limit
+        if nogoods is not None:
+            nogoods.add(state)
+        return False
+
     
 if __name__ == "__main__":
     mat = np.array([
@@ -100,7 +270,7 @@ if __name__ == "__main__":
         [0, 6, 0, 0, 0, 0, 2, 8, 0],
         [0, 0, 0, 4, 1, 9, 0, 0, 5],
         [0, 0, 0, 0, 8, 0, 0, 7, 9]
-    ], dtype=int)
+    ], dtype=np.uint8)
 
     history = SudokuHistory()
     solver = SudokuSolver()